@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+# See config/wsgi.py
+if getattr(settings, "EQUIPMENT_PRELOAD", False):
+    from equipment.startup import preload
+
+    preload()
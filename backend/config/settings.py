@@ -2,6 +2,8 @@
 Django settings for config project.
 """
 
+import os
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -35,6 +37,9 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    # First, so request timings cover the rest of the stack
+    'equipment.middleware.MetricsMiddleware',
+
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
 
@@ -75,12 +80,214 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # DATABASE
 # ========================
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=sqlite (default) or postgres.
+#
+# SQLite runs with a tuning profile unless SQLITE_TUNING=0: WAL so readers
+# never block the writer, synchronous=NORMAL (safe with WAL), a busy
+# timeout instead of instant "database is locked" errors, IMMEDIATE
+# transactions so writers queue up rather than deadlock on lock upgrade,
+# and a larger page cache plus mmap for reads.
+#
+# PostgreSQL keeps connections open for DB_CONN_MAX_AGE seconds and checks
+# them before reuse, or uses a psycopg connection pool with DB_POOL=1.
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgres':
+    DB_POOL = os.environ.get('DB_POOL', '0') == '1'
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'equipment'),
+            'USER': os.environ.get('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            # Django's pool and persistent connections are mutually exclusive
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+                    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+                },
+            } if DB_POOL else {},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {},
+        }
+    }
+
+    if os.environ.get('SQLITE_TUNING', '1') != '0':
+        DATABASES['default']['OPTIONS'] = {
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA cache_size=-65536;'
+                'PRAGMA mmap_size=268435456;'
+                'PRAGMA temp_store=MEMORY;'
+            ),
+        }
+
+
+# ========================
+# CACHE
+# ========================
+# Files under CACHE_DIR by default, shared by every worker process on the
+# host, so the invalidation on upload / prune reaches all of them (the
+# shipped gunicorn.conf.py runs several). CACHE_BACKEND=locmem is faster
+# but per process: only for a single worker. For several hosts point
+# CACHES at a shared backend (Redis, Memcached...).
+
+#
+# The "jobs" alias holds only ingestion job heartbeats and progress, a few
+# entries that expire on their own. It is never culled: an evicted
+# heartbeat would make a running job look orphaned.
+
+CACHE_DIR = os.environ.get('CACHE_DIR', BASE_DIR / 'cache')
+
+if os.environ.get('CACHE_BACKEND', 'file') == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'equipment',
+        },
+        'jobs': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'equipment-jobs',
+            'OPTIONS': {'MAX_ENTRIES': sys.maxsize},
+        },
     }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+            # Culling scans the directory; leave room for responses and events
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+        'jobs': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(CACHE_DIR, 'jobs'),
+            'OPTIONS': {'MAX_ENTRIES': sys.maxsize},
+        },
+    }
+
+
+# ========================
+# EQUIPMENT APP
+# ========================
+
+# Rows per INSERT batch when storing uploaded CSVs
+EQUIPMENT_INGEST_BATCH_SIZE = 5000
+
+# Rows parsed per CSV chunk; bounds peak memory for very large uploads
+EQUIPMENT_INGEST_CHUNK_ROWS = 50000
+
+# Return the existing dataset when an identical file is uploaded again
+# (POST upload-csv/?force=1 ingests it anyway)
+EQUIPMENT_DEDUPLICATE_UPLOADS = True
+
+# Rows that fail validation (missing/over-long text, missing, non-numeric
+# or out-of-range readings) either fail the upload ("reject") or are
+# skipped and kept in a per-dataset CSV ("quarantine"); override per
+# upload with ?on_error=
+EQUIPMENT_VALIDATION_MODE = 'reject'
+EQUIPMENT_VALIDATION_RANGES = {
+    'flowrate': (0.0, None),
+    'pressure': (0.0, None),
+    'temperature': (-273.15, None),
 }
+EQUIPMENT_VALIDATION_MAX_EXAMPLES = 20
+EQUIPMENT_QUARANTINE_DIR = BASE_DIR / 'quarantine'
+
+# Background ingestion (POST upload-csv/?async=1). Live progress is written
+# to the cache at most every EQUIPMENT_JOB_PROGRESS_INTERVAL seconds; jobs
+# of a process missing three heartbeats in a row are marked failed
+EQUIPMENT_JOB_WORKERS = 2
+EQUIPMENT_JOB_PROGRESS_INTERVAL = 1.0
+EQUIPMENT_JOB_HEARTBEAT_SECONDS = 10
+EQUIPMENT_JOBS_CACHE_ALIAS = 'jobs'
+EQUIPMENT_UPLOAD_STAGING_DIR = BASE_DIR / 'upload_staging'
+
+# Resumable uploads (api/uploads/): largest PUT chunk, and how long an
+# unfinished upload is kept before pruning removes it
+EQUIPMENT_UPLOAD_MAX_CHUNK_SIZE = 64 * 1024 * 1024
+EQUIPMENT_UPLOAD_SESSION_TTL_HOURS = 24
+
+# Upper bound for ?limit= on the records endpoint
+EQUIPMENT_RECORDS_MAX_PAGE_SIZE = 5000
+
+# Rows fetched per DB round trip when streaming exports
+EQUIPMENT_EXPORT_CHUNK_SIZE = 5000
+
+# Limits for the pre-binned chart endpoint (?bins= / ?grid=, ?points=)
+EQUIPMENT_BINNING_MAX_BINS = 500
+EQUIPMENT_BINNING_MAX_POINTS = 10000
+
+# Max rows per equipment type sampled for percentiles (exact below this)
+EQUIPMENT_STATS_SAMPLE_SIZE = 100000
+
+# Cached PDF reports, rendered in the background after each upload
+EQUIPMENT_REPORT_DIR = BASE_DIR / 'pdf_reports'
+EQUIPMENT_REPORT_PREBUILD = True
+
+# Most datasets accepted by datasets/compare/?ids=
+EQUIPMENT_COMPARE_MAX_DATASETS = 20
+
+# Per-dataset column files (.npy, memory-mapped on read) written at
+# ingestion; binning, stats and exports read them instead of the table.
+# Off unless EQUIPMENT_COLUMNAR_STORE=1, as it writes every upload twice
+EQUIPMENT_COLUMNAR_STORE = os.environ.get('EQUIPMENT_COLUMNAR_STORE', '0') == '1'
+EQUIPMENT_COLUMNAR_DIR = BASE_DIR / 'columnar'
+
+# Retention: keep the N newest datasets and/or those newer than N days
+# (None disables a rule). Applied in the background after every upload
+# and by `manage.py prune_datasets`.
+EQUIPMENT_RETENTION_KEEP = 5
+EQUIPMENT_RETENTION_DAYS = None
+EQUIPMENT_RETENTION_BATCH_SIZE = 10000
+EQUIPMENT_RETENTION_ON_UPLOAD = True
+
+# Cached JSON of the dataset list / records endpoints, dropped on every
+# upload and prune
+EQUIPMENT_CACHE_ALIAS = 'default'
+EQUIPMENT_CACHE_TIMEOUT = 300
+
+# Request timings: Server-Timing headers and Prometheus histograms at
+# api/metrics/ (per process). Set EQUIPMENT_PROFILE_SLOW_MS to stack-sample
+# requests and write those at least that slow to EQUIPMENT_PROFILE_DIR as
+# folded stacks (flamegraph.pl / speedscope)
+EQUIPMENT_METRICS = True
+EQUIPMENT_SERVER_TIMING = True
+EQUIPMENT_PROFILE_SLOW_MS = None
+EQUIPMENT_PROFILE_INTERVAL_MS = 5
+EQUIPMENT_PROFILE_DIR = BASE_DIR / 'profiles'
+
+# NumPy / pandas / matplotlib / ReportLab load on first use. With
+# EQUIPMENT_PRELOAD=1 they are imported when the WSGI app loads instead,
+# which under gunicorn.conf.py also turns on --preload so the master
+# imports them once and workers share the memory
+EQUIPMENT_PRELOAD = os.environ.get('EQUIPMENT_PRELOAD', '0') == '1'
+
+# Server-Sent Events at api/events/ (ASGI only). Events are logged in the
+# EQUIPMENT_CACHE_ALIAS cache for EQUIPMENT_EVENTS_TTL seconds, for replay
+# on reconnect; each process polls it every EQUIPMENT_EVENTS_POLL_SECONDS,
+# so with several processes that cache must be shared (not locmem).
+# Streams more than EQUIPMENT_EVENTS_QUEUE_SIZE events behind are closed
+EQUIPMENT_EVENTS = True
+EQUIPMENT_EVENTS_TTL = 300
+EQUIPMENT_EVENTS_POLL_SECONDS = 0.5
+EQUIPMENT_EVENTS_HEARTBEAT_SECONDS = 15
+EQUIPMENT_EVENTS_QUEUE_SIZE = 100
 
 
 # ========================
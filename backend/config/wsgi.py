@@ -9,8 +9,16 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# With gunicorn --preload (see gunicorn.conf.py) the master imports the
+# heavy modules once and workers share them copy-on-write
+if getattr(settings, "EQUIPMENT_PRELOAD", False):
+    from equipment.startup import preload
+
+    preload()
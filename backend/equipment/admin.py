@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import DatasetUpload, EquipmentRecord
+from .models import DatasetUpload, EquipmentRecord, EquipmentType, IngestionJob, UploadSession
 
 admin.site.register(DatasetUpload)
 admin.site.register(EquipmentRecord)
+admin.site.register(EquipmentType)
+admin.site.register(IngestionJob)
+admin.site.register(UploadSession)
@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
 
 
 class EquipmentConfig(AppConfig):
     name = 'equipment'
+
+    def ready(self):
+        from .jobs import fail_orphaned_jobs_on_startup
+        from .metrics import install_query_counter
+
+        # Count SQL per request on whichever thread runs it
+        connection_created.connect(install_query_counter)
+        request_started.connect(fail_orphaned_jobs_on_startup)
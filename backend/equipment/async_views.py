@@ -0,0 +1,90 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+
+from .caching import acached_json
+from .events import stream
+from .models import DatasetUpload
+from .records import RecordQueryError
+from .views import dataset_list_payload, records_payload, stats_payload
+
+# Async counterparts of the read endpoints, for ASGI deployments
+# (gunicorn.conf.py with EQUIPMENT_ASGI=1). Cache hits and the event
+# stream never leave the event loop; ORM work runs in a thread per request.
+# Plain Django views: DRF's APIView is synchronous.
+
+
+# ----------------------------
+# List last 5 datasets
+# ----------------------------
+class AsyncDatasetListView(View):
+    async def get(self, request):
+        return await acached_json(request, "datasets", dataset_list_payload)
+
+
+# ----------------------------
+# View records of a dataset
+# ----------------------------
+class AsyncDatasetRecordsView(View):
+    """Same parameters and cache entries as DatasetRecordsView."""
+
+    async def get(self, request, dataset_id):
+        return await acached_json(
+            request,
+            f"records:{dataset_id}",
+            lambda: self.build(request, dataset_id)
+        )
+
+    def build(self, request, dataset_id):
+        try:
+            return records_payload(dataset_id, request.GET)
+        except DatasetUpload.DoesNotExist:
+            return JsonResponse({"error": "Dataset not found"}, status=404)
+        except RecordQueryError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+
+# ----------------------------
+# Precomputed statistics of a dataset
+# ----------------------------
+class AsyncDatasetStatsView(View):
+    async def get(self, request, dataset_id):
+        try:
+            dataset = await DatasetUpload.objects.aget(id=dataset_id)
+        except DatasetUpload.DoesNotExist:
+            return JsonResponse({"error": "Dataset not found"}, status=404)
+
+        return JsonResponse(await sync_to_async(stats_payload)(dataset))
+
+
+# ----------------------------
+# Live dataset events (Server-Sent Events)
+# ----------------------------
+class DatasetEventsView(View):
+    """
+    A text/event-stream of "dataset.created", "ingestion.progress" and
+    "dataset.pruned" events, so dashboards update without polling. On
+    reconnect, browsers send Last-Event-ID and missed events still in the
+    log are replayed first.
+
+    Needs an ASGI server: WSGI would try to read the endless stream to
+    its end before sending anything.
+    """
+
+    async def get(self, request):
+        if not hasattr(request, "scope"):
+            return JsonResponse(
+                {"error": "The event stream needs the ASGI application (config.asgi)"},
+                status=501
+            )
+
+        try:
+            last_id = int(request.headers.get("Last-Event-ID", request.GET.get("last_event_id")))
+        except (TypeError, ValueError):
+            last_id = None
+
+        response = StreamingHttpResponse(stream(last_id), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Stop nginx from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -0,0 +1,102 @@
+import datetime
+import json
+import platform
+import subprocess
+
+import django
+import numpy as np
+
+from django.conf import settings
+from django.db import connection
+
+
+PERCENTILES = [50, 95, 99]
+
+
+def latency_summary(samples, elapsed=None):
+    """
+    Latency percentiles (ms) of ``samples`` in seconds, plus throughput
+    when the wall-clock ``elapsed`` time they were taken over is given.
+    """
+    summary = {"count": len(samples)}
+    if samples:
+        ms = np.asarray(samples) * 1000
+        summary.update({
+            "mean_ms": round(float(ms.mean()), 3),
+            "min_ms": round(float(ms.min()), 3),
+            "max_ms": round(float(ms.max()), 3),
+            **{
+                f"p{p}_ms": round(float(v), 3)
+                for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES))
+            },
+        })
+    if elapsed:
+        summary["per_second"] = round(len(samples) / elapsed, 2)
+    return summary
+
+
+def format_summary(summary):
+    if not summary["count"]:
+        return "no samples"
+    line = "  ".join(f"p{p} {summary[f'p{p}_ms']:9.2f} ms" for p in PERCENTILES)
+    if "per_second" in summary:
+        line += f"  {summary['per_second']:9.1f}/s"
+    return line
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment():
+    """Where a run happened, so result files from different commits line up."""
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "machine": platform.machine(),
+    }
+
+
+def write_results(path, kind, options, results):
+    with open(path, "w") as f:
+        json.dump(
+            {"kind": kind, "environment": environment(), "options": options, "results": results},
+            f,
+            indent=2,
+        )
+
+
+def compare_results(results, baseline_path):
+    """
+    ``[(name, baseline p50, current p50, ratio)]`` for the benchmarks both
+    runs have; a ratio above 1 means the current run is slower.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+
+    rows = []
+    for name, summary in results.items():
+        before = baseline.get(name, {}).get("p50_ms")
+        after = summary.get("p50_ms")
+        if before and after:
+            rows.append((name, before, after, after / before))
+    return rows
+
+
+def print_comparison(stdout, style, results, baseline_path):
+    stdout.write(style.MIGRATE_HEADING(f"\n== against {baseline_path} (p50)"))
+    for name, before, after, ratio in compare_results(results, baseline_path):
+        line = f"  {name:<32} {before:9.2f} ms -> {after:9.2f} ms  x{ratio:.2f}"
+        stdout.write(style.ERROR(line) if ratio > 1.1 else line)
@@ -0,0 +1,172 @@
+import numpy as np
+
+from django.conf import settings
+
+from .columnar import open_store
+from .models import EquipmentRecord
+from .records import RANGE_FIELDS, RecordQueryError, filter_records
+
+
+DEFAULT_BINS = 30
+DEFAULT_GRID = 40
+DEFAULT_POINTS = 1000
+
+DEFAULT_MAX_BINS = 500
+DEFAULT_MAX_POINTS = 10000
+
+
+def get_max_bins():
+    return int(getattr(settings, "EQUIPMENT_BINNING_MAX_BINS", DEFAULT_MAX_BINS))
+
+
+def get_max_points():
+    return int(getattr(settings, "EQUIPMENT_BINNING_MAX_POINTS", DEFAULT_MAX_POINTS))
+
+
+def _parse_int(params, key, default, low, high):
+    raw = params.get(key)
+    if raw in (None, ""):
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise RecordQueryError(f"'{key}' must be an integer")
+    if not low <= value <= high:
+        raise RecordQueryError(f"'{key}' must be between {low} and {high}")
+    return value
+
+
+def _parse_field(params, key, default):
+    field = params.get(key, default)
+    if field not in RANGE_FIELDS:
+        raise RecordQueryError(f"'{key}' must be one of: {', '.join(RANGE_FIELDS)}")
+    return field
+
+
+def parse_options(params):
+    """
+    Read ``?bins=``, ``?grid=``, ``?points=`` and the density axes
+    ``?x=`` / ``?y=`` (flowrate vs pressure by default).
+    """
+    max_bins = get_max_bins()
+    return {
+        "bins": _parse_int(params, "bins", DEFAULT_BINS, 1, max_bins),
+        "grid": _parse_int(params, "grid", DEFAULT_GRID, 1, max_bins),
+        "points": _parse_int(params, "points", DEFAULT_POINTS, 3, get_max_points()),
+        "x": _parse_field(params, "x", "flowrate"),
+        "y": _parse_field(params, "y", "pressure"),
+    }
+
+
+def load_columns(queryset):
+    """``{"id": int64 array, "flowrate": float64 array, ...}`` in id order."""
+    rows = list(queryset.order_by("id").values_list("id", *RANGE_FIELDS))
+    if not rows:
+        return {f: np.empty(0) for f in ["id"] + RANGE_FIELDS}
+
+    # NULL readings become NaN
+    matrix = np.array(rows, dtype="float64")
+    columns = {f: matrix[:, i + 1] for i, f in enumerate(RANGE_FIELDS)}
+    columns["id"] = matrix[:, 0].astype("int64")
+    return columns
+
+
+def dataset_columns(dataset_id, params):
+    """
+    Filtered columns of a dataset, memory-mapped from its column store
+    when there is one (zero-copy when unfiltered), else read from the table.
+    """
+    store = open_store(dataset_id)
+    if store is None:
+        records = EquipmentRecord.objects.filter(dataset_id=dataset_id)
+        return load_columns(filter_records(records, params))
+
+    mask = store.mask(params)
+    columns = {f: store.column(f) for f in ["id"] + RANGE_FIELDS}
+    if mask is not None:
+        columns = {f: column[mask] for f, column in columns.items()}
+    return columns
+
+
+def histogram(values, bins):
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return {"edges": [], "counts": []}
+
+    counts, edges = np.histogram(values, bins=bins)
+    return {"edges": edges.tolist(), "counts": counts.tolist()}
+
+
+def density_grid(x, y, bins):
+    """2D histogram of ``y`` against ``x``; ``counts[i][j]`` is x bin i, y bin j."""
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y = x[finite], y[finite]
+    if not len(x):
+        return {"x_edges": [], "y_edges": [], "counts": []}
+
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    return {
+        "x_edges": x_edges.tolist(),
+        "y_edges": y_edges.tolist(),
+        "counts": counts.astype("int64").tolist(),
+    }
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: keep ``threshold`` points of the series
+    that best preserve its visual shape. First and last points are always
+    kept; each bucket in between contributes the point forming the largest
+    triangle with the previously kept point and the next bucket's average.
+    """
+    n = len(x)
+    if threshold >= n:
+        return x, y
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype("int64")
+    selected = np.empty(threshold, dtype="int64")
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        following = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:following].mean()
+        avg_y = y[end:following].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+
+    return x[selected], y[selected]
+
+
+def series(ids, values, points):
+    """A reading against record id, downsampled to at most ``points``."""
+    finite = np.isfinite(values)
+    x, y = lttb(ids[finite].astype("float64"), values[finite], points)
+    return {"x": x.astype("int64").tolist(), "y": y.tolist()}
+
+
+def bin_dataset(columns, options):
+    """
+    Chart-ready summaries of record columns whose size depends only on the
+    requested bins and point budget, not on the number of rows.
+    """
+    return {
+        "count": len(columns["id"]),
+        "histograms": {
+            f: histogram(columns[f], options["bins"]) for f in RANGE_FIELDS
+        },
+        "density": {
+            "x": options["x"],
+            "y": options["y"],
+            **density_grid(columns[options["x"]], columns[options["y"]], options["grid"]),
+        },
+        "series": {
+            f: series(columns["id"], columns[f], options["points"]) for f in RANGE_FIELDS
+        },
+    }
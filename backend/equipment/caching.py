@@ -0,0 +1,136 @@
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from .metrics import span
+from .records import dumps
+
+
+GENERATION_KEY = "equipment:generation"
+DEFAULT_TIMEOUT = 300
+
+
+def get_cache():
+    return caches[getattr(settings, "EQUIPMENT_CACHE_ALIAS", "default")]
+
+
+def get_timeout():
+    return getattr(settings, "EQUIPMENT_CACHE_TIMEOUT", DEFAULT_TIMEOUT)
+
+
+def generation():
+    """
+    Current cache generation. It is part of every key, so bumping it
+    invalidates all cached responses at once. A missing counter (evicted or
+    a fresh cache) restarts from the clock so old keys are never reused.
+    """
+    cache = get_cache()
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        cache.add(GENERATION_KEY, time.time_ns(), None)
+        value = cache.get(GENERATION_KEY)
+    return value
+
+
+async def ageneration():
+    cache = get_cache()
+    value = await cache.aget(GENERATION_KEY)
+    if value is None:
+        await cache.aadd(GENERATION_KEY, time.time_ns(), None)
+        value = await cache.aget(GENERATION_KEY)
+    return value
+
+
+def invalidate():
+    """Drop every cached response; called when datasets change."""
+    cache = get_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, time.time_ns(), None)
+
+
+def _query_digest(request):
+    query = sorted(request.GET.lists())
+    return hashlib.sha1(repr(query).encode()).hexdigest()
+
+
+def cache_key(endpoint, request):
+    return f"equipment:{generation()}:{endpoint}:{_query_digest(request)}"
+
+
+async def acache_key(endpoint, request):
+    return f"equipment:{await ageneration()}:{endpoint}:{_query_digest(request)}"
+
+
+def _encode(payload):
+    with span("encode"):
+        body = dumps(payload)
+    return quote_etag(hashlib.sha256(body).hexdigest()[:32]), body
+
+
+def _response(request, entry):
+    etag, body = entry
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type="application/json")
+
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+def cached_json(request, endpoint, build):
+    """
+    Serve ``build()`` as JSON through the response cache, keyed by
+    ``endpoint`` and the query string, with an ETag for conditional GET.
+
+    ``build`` returns a JSON-serializable payload, or a response (e.g. a
+    404) which is passed through uncached.
+    """
+    cache = get_cache()
+    key = cache_key(endpoint, request)
+
+    with span("cache"):
+        entry = cache.get(key)
+    if entry is None:
+        payload = build()
+        if isinstance(payload, HttpResponseBase):
+            return payload
+
+        entry = _encode(payload)
+        cache.set(key, entry, get_timeout())
+
+    return _response(request, entry)
+
+
+async def acached_json(request, endpoint, build):
+    """
+    ``cached_json`` for async views. Hits are served from the event loop;
+    on a miss the synchronous ``build`` (ORM work) and the encoding run in
+    a thread. Keys are shared with ``cached_json``, so both views fill the
+    same entries.
+    """
+    cache = get_cache()
+    key = await acache_key(endpoint, request)
+
+    with span("cache"):
+        entry = await cache.aget(key)
+    if entry is None:
+        def build_entry():
+            payload = build()
+            return payload if isinstance(payload, HttpResponseBase) else _encode(payload)
+
+        entry = await sync_to_async(build_entry)()
+        if isinstance(entry, HttpResponseBase):
+            return entry
+        await cache.aset(key, entry, get_timeout())
+
+    return _response(request, entry)
@@ -0,0 +1,196 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import EquipmentRecord
+from .records import parse_filters
+
+
+# Fixed-width columns, one .npy file each. ``type`` holds codes into the
+# store's own type list (-1 for a missing type); ``equipment_name`` is kept
+# Arrow-style as UTF-8 bytes plus an offsets column.
+NUMERIC_COLUMNS = ["flowrate", "pressure", "temperature"]
+DTYPES = {
+    "id": np.dtype("int64"),
+    "type": np.dtype("int32"),
+    "flowrate": np.dtype("float64"),
+    "pressure": np.dtype("float64"),
+    "temperature": np.dtype("float64"),
+    "name_offsets": np.dtype("int64"),
+}
+
+NAME_DATA = "name_data.bin"
+META = "meta.json"
+STORE_VERSION = 1
+
+
+def is_enabled():
+    return getattr(settings, "EQUIPMENT_COLUMNAR_STORE", False)
+
+
+def get_columnar_dir():
+    path = str(getattr(settings, "EQUIPMENT_COLUMNAR_DIR", settings.BASE_DIR / "columnar"))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def store_path(dataset_id):
+    return os.path.join(get_columnar_dir(), f"dataset_{dataset_id}")
+
+
+def _write_npy(path, raw_path, dtype, rows):
+    """Write an .npy header for ``rows`` values, followed by the raw column."""
+    with open(path, "wb") as out, open(raw_path, "rb") as raw:
+        np.lib.format.write_array_header_1_0(out, {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": (rows,),
+        })
+        shutil.copyfileobj(raw, out)
+    os.remove(raw_path)
+
+
+class ColumnWriter:
+    """
+    Builds a dataset's column store chunk by chunk during ingestion.
+
+    Chunks are appended to raw files in a scratch directory, so memory
+    stays flat. ``finish`` turns them into .npy files and publishes the
+    store when the surrounding transaction commits; ``discard`` drops it.
+    """
+
+    def __init__(self):
+        self.path = tempfile.mkdtemp(prefix=".tmp_", dir=get_columnar_dir())
+        self.rows = 0
+        self.name_bytes = 0
+        self.type_codes = {}
+        self.files = {
+            name: open(self._raw(name), "wb")
+            for name in ["type", *NUMERIC_COLUMNS, "name_offsets"]
+        }
+        self.names = open(os.path.join(self.path, NAME_DATA), "wb")
+        self.files["name_offsets"].write(np.zeros(1, dtype=DTYPES["name_offsets"]).tobytes())
+
+    def _raw(self, name):
+        return os.path.join(self.path, f"{name}.raw")
+
+    def append(self, df):
+        """Append a normalized ingestion frame."""
+        for name in NUMERIC_COLUMNS:
+            self.files[name].write(df[name].to_numpy(DTYPES[name]).tobytes())
+
+        codes = [
+            -1 if not isinstance(name, str) else self.type_codes.setdefault(name, len(self.type_codes))
+            for name in df["type"].tolist()
+        ]
+        self.files["type"].write(np.array(codes, dtype=DTYPES["type"]).tobytes())
+
+        encoded = [
+            name.encode() if isinstance(name, str) else b""
+            for name in df["equipment_name"].tolist()
+        ]
+        offsets = self.name_bytes + np.cumsum([len(e) for e in encoded], dtype=DTYPES["name_offsets"])
+        self.files["name_offsets"].write(offsets.tobytes())
+        self.names.write(b"".join(encoded))
+
+        if len(offsets):
+            self.name_bytes = int(offsets[-1])
+        self.rows += len(df)
+
+    def finish(self, dataset_id):
+        """
+        Write the .npy files, with record ids read back from the table, and
+        move the store into place once the current transaction commits.
+        """
+        for handle in [*self.files.values(), self.names]:
+            handle.close()
+
+        for name in self.files:
+            rows = self.rows + 1 if name == "name_offsets" else self.rows
+            _write_npy(os.path.join(self.path, f"{name}.npy"), self._raw(name), DTYPES[name], rows)
+
+        ids = (
+            EquipmentRecord.objects
+            .filter(dataset_id=dataset_id)
+            .order_by("id")
+            .values_list("id", flat=True)
+            .iterator(chunk_size=50000)
+        )
+        np.save(os.path.join(self.path, "id.npy"), np.fromiter(ids, DTYPES["id"], count=self.rows))
+
+        types = sorted(self.type_codes, key=self.type_codes.get)
+        with open(os.path.join(self.path, META), "w") as f:
+            json.dump({"version": STORE_VERSION, "rows": self.rows, "types": types}, f)
+
+        transaction.on_commit(lambda: self._publish(dataset_id))
+
+    def _publish(self, dataset_id):
+        target = store_path(dataset_id)
+        delete_store(dataset_id)
+        os.replace(self.path, target)
+
+    def discard(self):
+        for handle in [*self.files.values(), self.names]:
+            handle.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+class ColumnStore:
+    """Read side of a dataset's column store; columns are memory-mapped."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META)) as f:
+            meta = json.load(f)
+        self.rows = meta["rows"]
+        self.types = meta["types"]
+
+    def column(self, name):
+        """Read-only memory map of a fixed-width column."""
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+
+    def type_names(self, codes):
+        lookup = self.types + [None]
+        return [lookup[code] for code in codes.tolist()]
+
+    def equipment_names(self, start, stop):
+        offsets = self.column("name_offsets")[start:stop + 1]
+        with open(os.path.join(self.path, NAME_DATA), "rb") as f:
+            f.seek(int(offsets[0]))
+            data = f.read(int(offsets[-1] - offsets[0]))
+
+        relative = (offsets - offsets[0]).tolist()
+        return [data[a:b].decode() for a, b in zip(relative, relative[1:])]
+
+    def mask(self, params):
+        """Boolean row mask for the records filters, or None if unfiltered."""
+        types, bounds = parse_filters(params)
+        if not types and not bounds:
+            return None
+
+        mask = np.ones(self.rows, dtype=bool)
+        if types:
+            codes = [self.types.index(t) for t in types if t in self.types]
+            mask &= np.isin(self.column("type"), codes)
+        for field, lookup, value in bounds:
+            column = self.column(field)
+            mask &= column >= value if lookup == "gte" else column <= value
+        return mask
+
+
+def open_store(dataset_id):
+    """The dataset's ColumnStore, or None if it has not been written."""
+    path = store_path(dataset_id)
+    if not os.path.exists(os.path.join(path, META)):
+        return None
+    return ColumnStore(path)
+
+
+def delete_store(dataset_id):
+    shutil.rmtree(store_path(dataset_id), ignore_errors=True)
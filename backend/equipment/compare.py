@@ -0,0 +1,104 @@
+import numpy as np
+
+from django.conf import settings
+
+from .stats import STAT_FIELDS, ensure_stats
+
+
+DEFAULT_MAX_DATASETS = 20
+
+
+class CompareError(ValueError):
+    pass
+
+
+def get_max_datasets():
+    return int(getattr(settings, "EQUIPMENT_COMPARE_MAX_DATASETS", DEFAULT_MAX_DATASETS))
+
+
+def parse_ids(params):
+    """Parse ``?ids=1,2,3`` into a list of distinct dataset ids."""
+    raw = params.get("ids", "")
+    try:
+        ids = list(dict.fromkeys(int(i) for i in raw.split(",") if i.strip()))
+    except ValueError:
+        raise CompareError("'ids' must be a comma-separated list of dataset ids")
+
+    if not 2 <= len(ids) <= get_max_datasets():
+        raise CompareError(f"'ids' must list between 2 and {get_max_datasets()} datasets")
+    return ids
+
+
+def _rounded(values):
+    return [None if np.isnan(v) else round(float(v), 4) for v in values]
+
+
+def _means(summaries):
+    """means[f, d]: mean of reading f in summary d (NaN where missing)."""
+    return np.array([
+        [s[f]["mean"] if s and s.get(f) else np.nan for s in summaries]
+        for f in STAT_FIELDS
+    ], dtype="float64")
+
+
+def _trend(means):
+    """Means per dataset, with absolute and relative change from the first."""
+    baseline = means[0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(baseline != 0, (means - baseline) / np.abs(baseline) * 100, np.nan)
+
+    return {
+        "means": _rounded(means),
+        "deltas": _rounded(means - baseline),
+        "pct_change": _rounded(pct),
+    }
+
+
+def compare_datasets(datasets):
+    """
+    Compare datasets (oldest first; the first is the baseline) from their
+    precomputed statistics, without reading any records.
+
+    Returns overall and per-type mean trends for each reading, type counts
+    and shares, and the total variation distance between each dataset's
+    type distribution and the baseline's (0 = identical, 1 = disjoint).
+    """
+    stats = [ensure_stats(d) for d in datasets]
+    types = list(dict.fromkeys(t for s in stats for t in s.get("by_type", {})))
+
+    # counts[t, d]: rows of type t in dataset d
+    counts = np.array(
+        [[s["by_type"].get(t, {}).get("count", 0) for s in stats] for t in types],
+        dtype="float64",
+    ).reshape(len(types), len(stats))
+    totals = counts.sum(axis=0)
+    shares = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+
+    overall = _means([s.get("overall") for s in stats])
+    by_type = {}
+    for i, name in enumerate(types):
+        type_means = _means([s["by_type"].get(name) for s in stats])
+        by_type[name] = {
+            "counts": counts[i].astype("int64").tolist(),
+            "share": _rounded(shares[i]),
+            "share_delta": _rounded(shares[i] - shares[i, 0]),
+            **{f: _trend(type_means[j]) for j, f in enumerate(STAT_FIELDS)},
+        }
+
+    shift = 0.5 * np.abs(shares - shares[:, :1]).sum(axis=0)
+
+    return {
+        "datasets": [
+            {
+                "id": d.id,
+                "filename": d.filename,
+                "uploaded_at": d.uploaded_at.isoformat(),
+                "total_count": d.total_count,
+            }
+            for d in datasets
+        ],
+        "baseline": datasets[0].id,
+        "overall": {f: _trend(overall[j]) for j, f in enumerate(STAT_FIELDS)},
+        "by_type": by_type,
+        "distribution_shift": _rounded(shift),
+    }
@@ -0,0 +1,216 @@
+import asyncio
+import time
+
+from django.conf import settings
+
+from .caching import get_cache
+from .records import dumps
+
+
+SEQUENCE_KEY = "equipment:events:seq"
+
+DEFAULT_TTL = 300
+DEFAULT_POLL_SECONDS = 0.5
+DEFAULT_HEARTBEAT_SECONDS = 15
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_BACKLOG = 1000
+
+# A missing event id is normally one still between publish's incr and set;
+# it is waited for this long before being given up as lost
+GAP_GRACE_SECONDS = 2.0
+
+
+def is_enabled():
+    return getattr(settings, "EQUIPMENT_EVENTS", True)
+
+
+def get_ttl():
+    return getattr(settings, "EQUIPMENT_EVENTS_TTL", DEFAULT_TTL)
+
+
+def get_poll_seconds():
+    return getattr(settings, "EQUIPMENT_EVENTS_POLL_SECONDS", DEFAULT_POLL_SECONDS)
+
+
+def get_heartbeat_seconds():
+    return getattr(settings, "EQUIPMENT_EVENTS_HEARTBEAT_SECONDS", DEFAULT_HEARTBEAT_SECONDS)
+
+
+def get_queue_size():
+    return int(getattr(settings, "EQUIPMENT_EVENTS_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+
+
+def event_key(event_id):
+    return f"equipment:events:{event_id}"
+
+
+# ----------------------------
+# Event log
+# ----------------------------
+def publish(kind, data):
+    """
+    Append an event to the log kept in the shared cache and wake this
+    process's streams. Every process polls the same sequence counter, so
+    with a shared cache (Redis, Memcached, file) streams on any worker see
+    it. Returns the event id.
+    """
+    if not is_enabled():
+        return None
+
+    cache = get_cache()
+    while True:
+        try:
+            event_id = cache.incr(SEQUENCE_KEY)
+        except ValueError:
+            # Missing counter: restart from the clock so ids keep increasing
+            cache.add(SEQUENCE_KEY, time.time_ns() // 1000, None)
+            event_id = cache.incr(SEQUENCE_KEY)
+
+        # incr is not atomic on every backend (the file cache reads and
+        # rewrites): if another process got the same id, take the next one
+        if cache.add(event_key(event_id), (kind, data), get_ttl()):
+            break
+
+    broadcaster.wake()
+    return event_id
+
+
+async def latest_event_id():
+    return await get_cache().aget(SEQUENCE_KEY)
+
+
+async def read_log(last_id):
+    """
+    ``(id, (kind, data))`` for every id logged after ``last_id``, oldest
+    first, at most the last DEFAULT_BACKLOG of them. The event is None for
+    ids that are not (or no longer) in the cache.
+    """
+    cache = get_cache()
+    latest = await cache.aget(SEQUENCE_KEY)
+    if latest is None or last_id is None or latest <= last_id:
+        return []
+
+    ids = range(max(last_id + 1, latest - DEFAULT_BACKLOG + 1), latest + 1)
+    found = await cache.aget_many([event_key(i) for i in ids])
+    return [(i, found.get(event_key(i))) for i in ids]
+
+
+async def events_since(last_id):
+    """``(id, kind, data)`` of the events still in the log after ``last_id``."""
+    return [(i, *event) for i, event in await read_log(last_id) if event is not None]
+
+
+def format_event(event):
+    event_id, kind, data = event
+    return f"id: {event_id}\nevent: {kind}\ndata: ".encode() + dumps(data) + b"\n\n"
+
+
+# ----------------------------
+# Fan-out to streams
+# ----------------------------
+class Broadcaster:
+    """
+    Delivers new events to the streams open in this process. One task on
+    the event loop polls the shared counter (or is woken by a local
+    publish) and reads new events with a single get_many, however many
+    clients are connected. A stream that falls a full queue behind is
+    closed; its client reconnects with Last-Event-ID and replays.
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self.loop = None
+        self.task = None
+        self.wakeup = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=get_queue_size())
+        self.subscribers.add(queue)
+
+        loop = asyncio.get_running_loop()
+        if self.task is None or self.task.done() or self.loop is not loop:
+            self.loop = loop
+            self.wakeup = asyncio.Event()
+            self.task = loop.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def wake(self):
+        """Thread-safe: publish() runs in worker threads."""
+        loop, wakeup = self.loop, self.wakeup
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def _drop(self, queue):
+        self.subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    async def _run(self):
+        last_id = await latest_event_id() or 0
+        gaps = {}
+
+        while self.subscribers:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), get_poll_seconds())
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+
+            for event_id, event in await read_log(last_id):
+                # Stop at a missing id until it lands or its grace runs out,
+                # so an event still being written is not overtaken
+                if event is None:
+                    missing = gaps.setdefault(event_id, time.monotonic())
+                    if time.monotonic() - missing < GAP_GRACE_SECONDS:
+                        break
+                    gaps.pop(event_id)
+                    last_id = event_id
+                    continue
+
+                gaps.pop(event_id, None)
+                last_id = event_id
+                event = (event_id, *event)
+                for queue in list(self.subscribers):
+                    try:
+                        queue.put_nowait(event)
+                    except asyncio.QueueFull:
+                        self._drop(queue)
+
+
+broadcaster = Broadcaster()
+
+
+async def stream(last_id=None):
+    """
+    Server-Sent Events: events after ``last_id`` still in the log, then new
+    ones as they are published, with a comment line as heartbeat so
+    proxies keep the connection open.
+    """
+    queue = broadcaster.subscribe()
+    try:
+        yield f"retry: {int(get_poll_seconds() * 1000) + 1000}\n\n".encode()
+
+        # The broadcaster may deliver replayed events again, and ones the
+        # replay skipped while they were being written; send each id once
+        replayed = set()
+        for event in await events_since(last_id):
+            replayed.add(event[0])
+            yield format_event(event)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), get_heartbeat_seconds())
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+
+            if event is None:
+                return
+            if event[0] not in replayed and (last_id is None or event[0] > last_id):
+                yield format_event(event)
+    finally:
+        broadcaster.unsubscribe(queue)
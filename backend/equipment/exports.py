@@ -0,0 +1,197 @@
+import csv
+import io
+
+import numpy as np
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .columnar import open_store
+from .ingest import COLUMN_MAP
+from .models import EquipmentRecord
+from .records import dumps
+
+
+EXPORT_FIELDS = ["equipment_name", "type", "flowrate", "pressure", "temperature"]
+EXPORT_LOOKUPS = {"type": "type__name"}
+
+# Column headers matching the upload format, so exports can be re-uploaded
+CSV_HEADERS = {field: header.title() for header, field in COLUMN_MAP.items()}
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+class ExportError(ValueError):
+    pass
+
+
+def get_chunk_size():
+    return int(getattr(settings, "EQUIPMENT_EXPORT_CHUNK_SIZE", DEFAULT_CHUNK_SIZE))
+
+
+def iter_columns(dataset_id, chunk_size=None):
+    """
+    Yield chunks of the dataset as lists of columns, in EXPORT_FIELDS order.
+
+    Read from the memory-mapped column store when the dataset has one (the
+    numeric columns are then NumPy slices), otherwise from the table
+    through a DB cursor so only one chunk is held in memory at a time.
+    """
+    chunk_size = chunk_size or get_chunk_size()
+    store = open_store(dataset_id)
+
+    if store is not None:
+        types = store.column("type")
+        numeric = [store.column(f) for f in EXPORT_FIELDS[2:]]
+        for start in range(0, store.rows, chunk_size):
+            stop = min(start + chunk_size, store.rows)
+            yield [
+                store.equipment_names(start, stop),
+                store.type_names(types[start:stop]),
+                *[column[start:stop] for column in numeric],
+            ]
+        return
+
+    rows = (
+        EquipmentRecord.objects
+        .filter(dataset_id=dataset_id)
+        .order_by("id")
+        .values_list(*[EXPORT_LOOKUPS.get(f, f) for f in EXPORT_FIELDS])
+        .iterator(chunk_size=chunk_size)
+    )
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield [list(column) for column in zip(*chunk)]
+            chunk = []
+    if chunk:
+        yield [list(column) for column in zip(*chunk)]
+
+
+def iter_chunks(dataset_id, chunk_size=None):
+    """Yield lists of record tuples in id order."""
+    for columns in iter_columns(dataset_id, chunk_size):
+        yield list(zip(*[
+            c.tolist() if isinstance(c, np.ndarray) else c for c in columns
+        ]))
+
+
+def stream_csv(dataset_id):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([CSV_HEADERS[f] for f in EXPORT_FIELDS])
+    for chunk in iter_chunks(dataset_id):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_ndjson(dataset_id):
+    for chunk in iter_chunks(dataset_id):
+        yield b"".join(
+            dumps(dict(zip(EXPORT_FIELDS, row))) + b"\n" for row in chunk
+        )
+
+
+class _ByteSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after each row group."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_parquet(dataset_id):
+    """One Parquet row group per chunk, flushed to the client as written."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("equipment_name", pa.string()),
+        ("type", pa.string()),
+        ("flowrate", pa.float64()),
+        ("pressure", pa.float64()),
+        ("temperature", pa.float64()),
+    ])
+
+    sink = _ByteSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    for columns in iter_columns(dataset_id):
+        writer.write_table(pa.Table.from_arrays(
+            [
+                pa.array(col, type=schema.field(i).type)
+                for i, col in enumerate(columns)
+            ],
+            schema=schema,
+        ))
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+async def async_chunks(chunks):
+    """
+    An export stream for ASGI servers. Django reads a synchronous iterator
+    into memory in full before sending it under ASGI; here each chunk is
+    produced in the request's sync thread (where the DB cursor lives) and
+    sent before the next is read.
+    """
+    done = object()
+    produce = sync_to_async(lambda: next(chunks, done), thread_sensitive=True)
+    try:
+        while (chunk := await produce()) is not done:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close, thread_sensitive=True)()
+
+
+STREAMERS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "parquet": stream_parquet,
+}
+
+
+def get_streamer(fmt):
+    if fmt not in STREAMERS:
+        raise ExportError(f"'format' must be one of: {', '.join(STREAMERS)}")
+
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ExportError("Parquet export requires the pyarrow package")
+
+    return STREAMERS[fmt]
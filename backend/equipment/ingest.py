@@ -0,0 +1,317 @@
+import hashlib
+import time
+
+import pandas as pd
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .caching import invalidate
+from .columnar import ColumnWriter, is_enabled as columnar_enabled
+from .events import publish
+from .metrics import span, timed
+from .models import DatasetUpload, EquipmentRecord, EquipmentType
+from .serializers import DatasetUploadSerializer
+from .stats import StatsAccumulator
+from .validation import CSVValidationError, QuarantineWriter, RowValidator, parse_mode
+
+
+# CSV header (lower-cased) -> EquipmentRecord field
+COLUMN_MAP = {
+    "equipment name": "equipment_name",
+    "type": "type",
+    "flowrate": "flowrate",
+    "pressure": "pressure",
+    "temperature": "temperature",
+}
+
+RECORD_FIELDS = list(COLUMN_MAP.values())
+NUMERIC_FIELDS = ["flowrate", "pressure", "temperature"]
+TEXT_FIELDS = ["equipment_name", "type"]
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_CHUNK_ROWS = 50000
+
+
+def get_batch_size():
+    return int(getattr(settings, "EQUIPMENT_INGEST_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+
+
+def get_chunk_rows():
+    return int(getattr(settings, "EQUIPMENT_INGEST_CHUNK_ROWS", DEFAULT_CHUNK_ROWS))
+
+
+def rename_columns(df):
+    """
+    Map CSV headers to model fields, values untouched. Missing columns come
+    back as all-null columns.
+    """
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    return df.rename(columns=COLUMN_MAP).reindex(columns=RECORD_FIELDS)
+
+
+def normalize_frame(df):
+    """
+    Rename CSV headers to model fields and coerce column types in one
+    vectorized pass; unparseable numbers become NaN.
+    """
+    df = rename_columns(df)
+
+    for field in NUMERIC_FIELDS:
+        df[field] = pd.to_numeric(df[field], errors="coerce").astype("float64")
+
+    for field in TEXT_FIELDS:
+        column = df[field]
+        df[field] = column.where(column.isna(), column.astype(str).str.strip())
+
+    return df
+
+
+def check_header(file):
+    """
+    Read only the header row and fail fast if it is missing required
+    columns, or the file is empty. The file is rewound.
+    """
+    try:
+        columns = pd.read_csv(file, nrows=0).columns
+    except pd.errors.EmptyDataError:
+        raise CSVValidationError({"error": "The file is empty"})
+    finally:
+        file.seek(0)
+
+    found = {str(c).strip().lower() for c in columns}
+    missing = [header.title() for header in COLUMN_MAP if header not in found]
+    if missing:
+        raise CSVValidationError({"error": "Missing required columns", "missing_columns": missing})
+
+
+def _insert_sql():
+    meta = EquipmentRecord._meta
+    qn = connection.ops.quote_name
+    columns = [meta.get_field(f).column for f in ["dataset"] + RECORD_FIELDS]
+    return "INSERT INTO {} ({}) VALUES ({})".format(
+        qn(meta.db_table),
+        ", ".join(qn(c) for c in columns),
+        ", ".join(["%s"] * len(columns)),
+    )
+
+
+def resolve_types(names):
+    """Map type names to EquipmentType ids, creating any that are new."""
+    names = set(names)
+    type_ids = dict(
+        EquipmentType.objects.filter(name__in=names).values_list("name", "id")
+    )
+
+    missing = names - set(type_ids)
+    if missing:
+        EquipmentType.objects.bulk_create(
+            [EquipmentType(name=name) for name in missing],
+            ignore_conflicts=True,
+        )
+        type_ids.update(
+            EquipmentType.objects.filter(name__in=missing).values_list("name", "id")
+        )
+
+    return type_ids
+
+
+def insert_records(dataset, df, batch_size=None):
+    """
+    Insert a normalized frame with one parameterized executemany per batch.
+
+    bulk_create spends most of its time compiling per-value SQL, so rows are
+    fed straight from the frame's columns to the DB cursor instead. Type
+    names are swapped for EquipmentType ids on the way in.
+    """
+    batch_size = batch_size or get_batch_size()
+    sql = _insert_sql()
+    type_index = RECORD_FIELDS.index("type")
+    type_ids = resolve_types(df["type"].dropna().unique())
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(df), batch_size):
+            chunk = df.iloc[start:start + batch_size]
+            columns = [chunk[field].tolist() for field in RECORD_FIELDS]
+            columns[type_index] = [type_ids.get(name) for name in columns[type_index]]
+            cursor.executemany(
+                sql,
+                [(dataset.pk, *row) for row in zip(*columns)],
+            )
+
+    return len(df)
+
+
+class SummaryAccumulator:
+    """
+    Running dataset summary (count, means, type counts) that is updated one
+    chunk at a time, so memory stays flat no matter how big the upload is.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.sums = dict.fromkeys(NUMERIC_FIELDS, 0.0)
+        self.non_null = dict.fromkeys(NUMERIC_FIELDS, 0)
+        self.type_counts = {}
+
+    def update(self, df):
+        self.count += len(df)
+
+        for field in NUMERIC_FIELDS:
+            column = df[field]
+            self.sums[field] += float(column.sum())
+            self.non_null[field] += int(column.count())
+
+        for key, value in df["type"].value_counts().items():
+            key = str(key)
+            self.type_counts[key] = self.type_counts.get(key, 0) + int(value)
+
+    def mean(self, field):
+        if not self.non_null[field]:
+            return 0.0
+        return self.sums[field] / self.non_null[field]
+
+    def apply(self, dataset):
+        dataset.total_count = self.count
+        dataset.avg_flowrate = self.mean("flowrate")
+        dataset.avg_pressure = self.mean("pressure")
+        dataset.avg_temperature = self.mean("temperature")
+        dataset.type_distribution = dict(
+            sorted(self.type_counts.items(), key=lambda item: -item[1])
+        )
+
+
+def content_digest(file):
+    """SHA-256 hex digest of a file, read in 1 MB blocks; the file is rewound."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for block in iter(lambda: file.read(1 << 20), b""):
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def find_duplicate(content_hash):
+    """
+    The newest dataset uploaded from an identical file, or None. Always
+    None when EQUIPMENT_DEDUPLICATE_UPLOADS is off.
+    """
+    if not getattr(settings, "EQUIPMENT_DEDUPLICATE_UPLOADS", True) or not content_hash:
+        return None
+    return (
+        DatasetUpload.objects
+        .filter(content_hash=content_hash)
+        .order_by("-uploaded_at", "-id")
+        .first()
+    )
+
+
+def publish_created(dataset):
+    """Tell live dashboards about a new dataset, as the list endpoint shows it."""
+    publish("dataset.created", dict(DatasetUploadSerializer(dataset).data))
+
+
+def read_chunks(file, chunk_rows=None):
+    """
+    Yield ``(raw, df)`` for every ``chunk_rows`` rows of a CSV: the chunk
+    with headers mapped to record fields, and its normalized copy.
+    """
+    chunk_rows = chunk_rows or get_chunk_rows()
+
+    try:
+        for chunk in pd.read_csv(file, chunksize=chunk_rows):
+            raw = rename_columns(chunk)
+            yield raw, normalize_frame(raw)
+    except (pd.errors.ParserError, UnicodeDecodeError) as e:
+        raise CSVValidationError({"error": f"Could not parse CSV: {e}"})
+
+
+def ingest_csv(file, filename, batch_size=None, chunk_rows=None, progress=None,
+               content_hash="", on_error=None):
+    """
+    Stream an uploaded CSV into a new dataset.
+
+    The header is checked first, then the file is parsed ``chunk_rows`` rows
+    at a time; each chunk is validated, inserted and folded into the
+    running summary before the next one is read. All inserts run inside a
+    single transaction so a failure never leaves a half-written dataset
+    behind. With the columnar store enabled, each chunk is also appended to
+    the dataset's column files.
+
+    Invalid rows are handled per ``on_error`` (EQUIPMENT_VALIDATION_MODE by
+    default): "reject" stops inserting at the first one, validates the rest
+    of the file and raises CSVValidationError with the full report;
+    "quarantine" skips them and writes them to the dataset's rejected-rows
+    CSV.
+
+    ``progress``, if given, is called with the running row count after
+    every chunk; ``content_hash`` is stored on the dataset for duplicate
+    detection. Returns ``(dataset, stats)`` where ``stats`` reports row
+    count, elapsed time and throughput.
+    """
+    started = time.perf_counter()
+    quarantine = parse_mode(on_error) == "quarantine"
+    with span("header"):
+        check_header(file)
+
+    validator = RowValidator()
+    summary = SummaryAccumulator()
+    stats = StatsAccumulator()
+    columns = ColumnWriter() if columnar_enabled() else None
+    rejected = QuarantineWriter([h.title() for h in COLUMN_MAP]) if quarantine else None
+
+    try:
+        with transaction.atomic():
+            dataset = DatasetUpload.objects.create(filename=filename, content_hash=content_hash)
+
+            for raw, df in timed(read_chunks(file, chunk_rows), "parse"):
+                with span("validate"):
+                    invalid, messages = validator.check(raw, df)
+
+                if validator.invalid and not quarantine:
+                    continue
+                if invalid.any():
+                    rejected.append(raw[invalid], messages)
+                    df = df[~invalid]
+
+                with span("insert"):
+                    insert_records(dataset, df, batch_size)
+                with span("summarize"):
+                    summary.update(df)
+                    stats.update(df)
+                if columns is not None:
+                    with span("columnar"):
+                        columns.append(df)
+
+                if progress is not None:
+                    progress(validator.rows)
+
+            if validator.invalid and (not quarantine or not summary.count):
+                raise CSVValidationError({"error": "CSV failed validation", **validator.report()})
+
+            summary.apply(dataset)
+            dataset.stats = stats.result()
+            dataset.rejected_count = validator.invalid
+            dataset.save()
+
+            if columns is not None:
+                columns.finish(dataset.id)
+            if rejected is not None:
+                rejected.finish(dataset.id)
+            transaction.on_commit(invalidate)
+            transaction.on_commit(lambda: publish_created(dataset))
+    except BaseException:
+        for writer in [columns, rejected]:
+            if writer is not None:
+                writer.discard()
+        raise
+
+    elapsed = time.perf_counter() - started
+    rows = summary.count
+
+    return dataset, {
+        "rows": rows,
+        "rejected_rows": validator.invalid,
+        "elapsed_seconds": round(elapsed, 4),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else None,
+    }
@@ -0,0 +1,275 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import request_started
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .events import publish
+from .metrics import collect
+from .models import IngestionJob
+from .reports import prebuild_report
+from .retention import prune_in_background
+
+
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_PROGRESS_INTERVAL = 1.0
+DEFAULT_HEARTBEAT_SECONDS = 10
+
+# Progress of a job that died mid-run expires after this long
+PROGRESS_TTL = 3600
+
+_executor = None
+_executor_lock = threading.Lock()
+_worker_id = None
+
+# Live row counts of running jobs and the heartbeats of processes running
+# jobs live in a shared cache, so any worker can answer a status poll. The
+# ingestion itself holds one transaction, so they can't go in the DB (on
+# SQLite a heartbeat write would wait for it). The cache must not evict
+# them early: see CACHES["jobs"].
+PROGRESS_KEY = "equipment:jobs:{}:progress"
+HEARTBEAT_KEY = "equipment:jobs:worker:{}"
+
+
+def get_staging_dir():
+    path = getattr(
+        settings,
+        "EQUIPMENT_UPLOAD_STAGING_DIR",
+        os.path.join(settings.BASE_DIR, "upload_staging"),
+    )
+    os.makedirs(path, exist_ok=True)
+    return str(path)
+
+
+def get_progress_interval():
+    return getattr(settings, "EQUIPMENT_JOB_PROGRESS_INTERVAL", DEFAULT_PROGRESS_INTERVAL)
+
+
+def get_heartbeat_seconds():
+    return getattr(settings, "EQUIPMENT_JOB_HEARTBEAT_SECONDS", DEFAULT_HEARTBEAT_SECONDS)
+
+
+def get_jobs_cache():
+    return caches[getattr(settings, "EQUIPMENT_JOBS_CACHE_ALIAS", "default")]
+
+
+def worker_id():
+    """Identifies this process; recomputed after a fork."""
+    global _worker_id
+
+    pid = os.getpid()
+    if _worker_id is None or _worker_id[0] != pid:
+        _worker_id = (pid, f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}")
+    return _worker_id[1]
+
+
+def beat():
+    """Mark this process's worker pool alive for three heartbeat periods."""
+    interval = get_heartbeat_seconds()
+    get_jobs_cache().set(HEARTBEAT_KEY.format(worker_id()), time.time(), interval * 3)
+
+
+def _heartbeat():
+    while True:
+        time.sleep(get_heartbeat_seconds())
+        beat()
+
+
+def get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            beat()
+            threading.Thread(target=_heartbeat, name="ingest-heartbeat", daemon=True).start()
+            _executor = ThreadPoolExecutor(
+                max_workers=int(getattr(settings, "EQUIPMENT_JOB_WORKERS", DEFAULT_JOB_WORKERS)),
+                thread_name_prefix="ingest",
+            )
+        return _executor
+
+
+def stage_upload(file):
+    """Copy an uploaded file to the staging dir and return its path."""
+    path = os.path.join(get_staging_dir(), f"{uuid.uuid4().hex}.csv")
+
+    with open(path, "wb") as out:
+        for chunk in file.chunks():
+            out.write(chunk)
+
+    return path
+
+
+def enqueue_staged(filename, staged_path, content_hash="", on_error=None):
+    """
+    Schedule ingestion of an already staged file on the worker pool. Inside
+    a transaction the job is submitted once it commits, so the worker sees
+    the job row and a rollback leaves nothing queued.
+    """
+    executor = get_executor()
+    job = IngestionJob.objects.create(
+        filename=filename, staged_path=staged_path, worker=worker_id()
+    )
+    transaction.on_commit(lambda: executor.submit(run_job, job.id, content_hash, on_error))
+    return job
+
+
+def enqueue_ingestion(file, content_hash="", on_error=None):
+    """Stage an upload and schedule it on the worker pool."""
+    return enqueue_staged(file.name, stage_upload(file), content_hash, on_error)
+
+
+def schedule_report(dataset_id):
+    """Render the PDF report in the background right after ingestion."""
+    if getattr(settings, "EQUIPMENT_REPORT_PREBUILD", True):
+        get_executor().submit(prebuild_report, dataset_id)
+
+
+def schedule_prune():
+    """Apply the retention policy off the request path."""
+    if getattr(settings, "EQUIPMENT_RETENTION_ON_UPLOAD", True):
+        get_executor().submit(prune_in_background)
+
+
+def get_live_progress(job_id):
+    return get_jobs_cache().get(PROGRESS_KEY.format(job_id))
+
+
+def is_orphaned(job):
+    """
+    A queued or running job whose process stopped sending heartbeats: it
+    exited (crash, restart, deploy) and the job will never finish.
+    """
+    if job.status not in (IngestionJob.STATUS_QUEUED, IngestionJob.STATUS_RUNNING):
+        return False
+    return not job.worker or get_jobs_cache().get(HEARTBEAT_KEY.format(job.worker)) is None
+
+
+def fail_orphaned(job):
+    """
+    Mark an orphaned job failed and drop its staged file. Only a job still
+    queued or running is changed, so one that finished since it was read
+    keeps its outcome. Returns whether the job was failed.
+    """
+    job.status = IngestionJob.STATUS_FAILED
+    job.error = "The worker process running this job exited before it finished"
+    job.finished_at = timezone.now()
+
+    updated = IngestionJob.objects.filter(
+        id=job.id,
+        status__in=[IngestionJob.STATUS_QUEUED, IngestionJob.STATUS_RUNNING],
+    ).update(status=job.status, error=job.error, finished_at=job.finished_at)
+    if not updated:
+        job.refresh_from_db()
+        return False
+
+    if os.path.exists(job.staged_path):
+        os.remove(job.staged_path)
+    publish_progress(job, error=job.error)
+    return True
+
+
+def fail_orphaned_jobs():
+    """Fail every orphaned job. Returns how many there were."""
+    jobs = IngestionJob.objects.filter(
+        status__in=[IngestionJob.STATUS_QUEUED, IngestionJob.STATUS_RUNNING]
+    )
+    return sum(fail_orphaned(job) for job in jobs if is_orphaned(job))
+
+
+def fail_orphaned_jobs_on_startup(**kwargs):
+    """
+    request_started receiver, disconnected after the first request: jobs
+    left behind by a process that exited are failed when a new one starts.
+    Ones whose heartbeat has not expired yet are caught when polled.
+    """
+    request_started.disconnect(fail_orphaned_jobs_on_startup)
+    fail_orphaned_jobs()
+
+
+def publish_progress(job, **extra):
+    publish("ingestion.progress", {
+        "job_id": job.id,
+        "filename": job.filename,
+        "status": job.status,
+        **extra,
+    })
+
+
+def run_job(job_id, content_hash="", on_error=None):
+    from .ingest import ingest_csv
+
+    close_old_connections()
+    job = IngestionJob.objects.get(id=job_id)
+    started = time.perf_counter()
+    reported = [0.0]
+    progress_key = PROGRESS_KEY.format(job_id)
+
+    def report(rows):
+        # Throttled: one cache write and event per interval, not per chunk
+        now = time.perf_counter()
+        if now - reported[0] < get_progress_interval():
+            return
+        reported[0] = now
+
+        elapsed = now - started
+        progress = {
+            "rows_processed": rows,
+            "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else None,
+        }
+        get_jobs_cache().set(progress_key, progress, PROGRESS_TTL)
+        publish_progress(job, **progress)
+
+    # A job failed as orphaned while it waited in the queue stays failed
+    job.status = IngestionJob.STATUS_RUNNING
+    job.started_at = timezone.now()
+    started_running = IngestionJob.objects.filter(
+        id=job_id, status=IngestionJob.STATUS_QUEUED
+    ).update(status=job.status, started_at=job.started_at)
+    if not started_running:
+        close_old_connections()
+        return
+    publish_progress(job)
+
+    try:
+        with collect(), open(job.staged_path, "rb") as f:
+            dataset, stats = ingest_csv(
+                f, job.filename, progress=report,
+                content_hash=content_hash, on_error=on_error
+            )
+
+        job.status = IngestionJob.STATUS_DONE
+        job.dataset = dataset
+        job.rows_processed = stats["rows"]
+        job.rows_per_second = stats["rows_per_second"]
+
+        schedule_report(dataset.id)
+        schedule_prune()
+    except Exception as e:
+        job.status = IngestionJob.STATUS_FAILED
+        job.error = str(e)
+    finally:
+        job.finished_at = timezone.now()
+        job.save(update_fields=[
+            "status", "dataset", "rows_processed", "rows_per_second", "error", "finished_at"
+        ])
+        get_jobs_cache().delete(progress_key)
+        publish_progress(
+            job,
+            rows_processed=job.rows_processed,
+            rows_per_second=job.rows_per_second,
+            dataset_id=job.dataset_id,
+            error=job.error or None,
+        )
+
+        if os.path.exists(job.staged_path):
+            os.remove(job.staged_path)
+
+        close_old_connections()
@@ -0,0 +1,115 @@
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+
+from equipment.benchmarks import format_summary, latency_summary, print_comparison, write_results
+from equipment.caching import invalidate
+from equipment.pdf_utils import generate_dataset_pdf
+from equipment.retention import delete_dataset
+from equipment.synthetic import synthetic_csv
+from equipment.views import DatasetRecordsView, UploadCSVView
+
+
+RECORD_QUERIES = {
+    "records page": "limit=100",
+    "records page (columns)": "layout=columns&limit=1000",
+    "records filtered": "type=Pump&min_pressure=5&limit=500",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmarks of CSV upload (UploadCSVView.post), the records "
+        "endpoint (DatasetRecordsView.get, cold and cached) and PDF rendering "
+        "(generate_dataset_pdf) on synthetic data. Reports p50/p95/p99 and "
+        "writes them to --output as JSON; --compare prints the change "
+        "against an earlier run. Datasets it creates are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=20000, help="Rows per uploaded CSV")
+        parser.add_argument("--types", type=int, default=6, help="Distinct equipment types")
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--warmup", type=int, default=1, help="Untimed runs first")
+        parser.add_argument("--output", help="Write results to this JSON file")
+        parser.add_argument("--compare", help="Earlier --output file to compare against")
+
+    def handle(self, *args, **options):
+        self.factory = RequestFactory()
+        self.created = []
+
+        # Background report builds and pruning would skew (and delete) the runs
+        with override_settings(EQUIPMENT_REPORT_PREBUILD=False, EQUIPMENT_RETENTION_ON_UPLOAD=False):
+            try:
+                results = self._run(options)
+            finally:
+                for dataset_id in self.created:
+                    delete_dataset(dataset_id)
+
+        if options["output"]:
+            write_results(options["output"], "bench_api", options, results)
+            self.stdout.write(f"\nResults written to {options['output']}")
+        if options["compare"]:
+            print_comparison(self.stdout, self.style, results, options["compare"])
+
+    def _run(self, options):
+        self.stdout.write(
+            f"{options['rows']} rows, {options['types']} types, "
+            f"{options['repeat']} runs each (+{options['warmup']} warmup)"
+        )
+        results = {}
+
+        # Each upload gets its own seed, so none is a duplicate of another
+        payloads = iter(
+            synthetic_csv(options["rows"], options["types"], seed)
+            for seed in range(options["warmup"] + options["repeat"])
+        )
+        results["upload"] = self._bench("upload", lambda: self._upload(next(payloads)), options)
+
+        dataset_id = self.created[-1]
+        for name, query in RECORD_QUERIES.items():
+            results[f"{name} (cold)"] = self._bench(
+                f"{name} (cold)", lambda: self._records(dataset_id, query, cold=True), options
+            )
+            results[f"{name} (cached)"] = self._bench(
+                f"{name} (cached)", lambda: self._records(dataset_id, query), options
+            )
+
+        results["pdf"] = self._bench("pdf", lambda: generate_dataset_pdf(dataset_id), options)
+        return results
+
+    def _bench(self, name, fn, options):
+        for _ in range(options["warmup"]):
+            fn()
+
+        samples = []
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - started)
+
+        summary = latency_summary(samples)
+        self.stdout.write(f"  {name:<32} {format_summary(summary)}")
+        return summary
+
+    def _check(self, response):
+        if response.status_code >= 400:
+            detail = getattr(response, "data", None) or response.content[:500]
+            raise CommandError(f"{response.status_code}: {detail}")
+        return response
+
+    def _upload(self, payload):
+        request = self.factory.post(
+            "/api/upload-csv/",
+            {"file": SimpleUploadedFile("bench.csv", payload, content_type="text/csv")},
+        )
+        response = self._check(UploadCSVView.as_view()(request))
+        self.created.append(response.data["dataset_id"])
+
+    def _records(self, dataset_id, query, cold=False):
+        if cold:
+            invalidate()
+        request = self.factory.get(f"/api/datasets/{dataset_id}/records/?{query}")
+        self._check(DatasetRecordsView.as_view()(request, dataset_id=dataset_id))
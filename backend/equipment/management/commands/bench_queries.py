@@ -0,0 +1,112 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+
+from equipment.ingest import insert_records
+from equipment.models import DatasetUpload, EquipmentRecord
+from equipment.synthetic import synthetic_frame
+
+
+class Command(BaseCommand):
+    help = (
+        "Show query plans and latency of the main equipment queries with and "
+        "without the equipment indexes, on a synthetic table. Everything is "
+        "rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000000)
+        parser.add_argument("--datasets", type=int, default=5)
+        parser.add_argument("--types", type=int, default=6)
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            target = self._populate(options)
+
+            results = {}
+            for label, indexed in [("baseline (FK index only)", False), ("indexed", True)]:
+                self._set_indexes(indexed)
+                self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {label}"))
+                results[label] = self._run(target, options["repeat"])
+
+            self.stdout.write(self.style.MIGRATE_HEADING("\n== summary (best of %d)" % options["repeat"]))
+            before, after = results.values()
+            for name in before:
+                self.stdout.write(
+                    f"  {name:<28} {before[name] * 1000:9.2f} ms -> "
+                    f"{after[name] * 1000:9.2f} ms  x{before[name] / after[name]:.1f}"
+                )
+
+            transaction.set_rollback(True)
+
+    def _populate(self, options):
+        rows_per_dataset = options["rows"] // options["datasets"]
+        self.stdout.write(
+            f"Inserting {options['datasets']} x {rows_per_dataset} rows "
+            f"({options['types']} types)..."
+        )
+
+        started = time.perf_counter()
+        datasets = []
+        for i in range(options["datasets"]):
+            dataset = DatasetUpload.objects.create(filename=f"bench_{i}.csv")
+            insert_records(dataset, synthetic_frame(rows_per_dataset, options["types"], seed=i))
+            datasets.append(dataset)
+        self.stdout.write(f"  done in {time.perf_counter() - started:.1f}s")
+
+        # Query a dataset in the middle of the table
+        return datasets[len(datasets) // 2]
+
+    def _set_indexes(self, indexed):
+        qn = connection.ops.quote_name
+        table = qn(EquipmentRecord._meta.db_table)
+        fk_index = qn("bench_record_dataset_fk")
+
+        with connection.cursor() as cursor:
+            for model in [DatasetUpload, EquipmentRecord]:
+                for index in model._meta.indexes:
+                    if indexed:
+                        cursor.execute(str(index.create_sql(model, connection.schema_editor())))
+                    else:
+                        cursor.execute(f"DROP INDEX {qn(index.name)}")
+
+            # The pre-index schema had a plain index on the dataset FK
+            if indexed:
+                cursor.execute(f"DROP INDEX {fk_index}")
+            else:
+                cursor.execute(f"CREATE INDEX {fk_index} ON {table} ({qn('dataset_id')})")
+
+    def _queries(self, dataset):
+        records = EquipmentRecord.objects.filter(dataset=dataset)
+        middle = records.order_by("id").values_list("id", flat=True)[dataset.total_count // 2 or 0]
+
+        return {
+            "dataset list": DatasetUpload.objects.order_by("-uploaded_at")[:5],
+            "records page (cursor)": records.filter(id__gt=middle).order_by("id")[:100],
+            "records page (type filter)": records.filter(type__name="Pump").order_by("id")[:100],
+            "rows of one type": records.filter(type__name="Pump").values("dataset").annotate(n=Count("id")),
+            "type distribution": records.values("type__name").annotate(n=Count("id")),
+            "dataset row count": records.values("dataset").annotate(n=Count("id")),
+        }
+
+    def _run(self, dataset, repeat):
+        dataset.total_count = EquipmentRecord.objects.filter(dataset=dataset).count()
+        timings = {}
+
+        for name, queryset in self._queries(dataset).items():
+            self.stdout.write(f"\n  {name}")
+            for line in queryset.explain().splitlines():
+                self.stdout.write(f"    {line}")
+
+            best = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                best = min(best, time.perf_counter() - started)
+            timings[name] = best
+            self.stdout.write(f"    -> {best * 1000:.2f} ms")
+
+        return timings
@@ -0,0 +1,65 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from equipment.models import DatasetUpload, EquipmentRecord
+from equipment.records import (
+    RECORD_FIELDS,
+    dumps,
+    paginate_records,
+    rows_to_columns,
+    rows_to_records,
+)
+from equipment.serializers import EquipmentRecordSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF EquipmentRecordSerializer against the values_list "
+        "fast path used by the records endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset_id", type=int)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        dataset_id = options["dataset_id"]
+        if not DatasetUpload.objects.filter(id=dataset_id).exists():
+            raise CommandError(f"Dataset {dataset_id} not found")
+
+        queryset = EquipmentRecord.objects.filter(dataset_id=dataset_id).order_by("id")
+
+        def drf():
+            return json.dumps(EquipmentRecordSerializer(queryset, many=True).data)
+
+        def fast_rows():
+            rows, _ = paginate_records(queryset, {})
+            return dumps(rows_to_records(RECORD_FIELDS, rows))
+
+        def fast_columns():
+            rows, _ = paginate_records(queryset, {})
+            return dumps(rows_to_columns(RECORD_FIELDS, rows))
+
+        count = queryset.count()
+        self.stdout.write(f"Dataset {dataset_id}: {count} records, best of {options['repeat']}")
+
+        baseline = None
+        for name, fn in [("drf", drf), ("fast_rows", fast_rows), ("fast_columns", fast_columns)]:
+            best, size = self._time(fn, options["repeat"])
+            baseline = baseline or best
+            self.stdout.write(
+                f"  {name:<13} {best * 1000:9.1f} ms  "
+                f"{count / best:12.0f} rows/s  {size / 1024:9.0f} KiB  "
+                f"x{baseline / best:.1f}"
+            )
+
+    def _time(self, fn, repeat):
+        best = float("inf")
+        size = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            size = len(fn())
+            best = min(best, time.perf_counter() - started)
+        return best, size
@@ -0,0 +1,100 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from equipment.benchmarks import print_comparison, write_results
+
+
+MODES = ["lazy", "eager", "preload"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker cold start: forks --workers processes from a fresh "
+        "interpreter the way gunicorn does and times each from fork to its "
+        "first responses, then reads per-worker RSS and PSS (shared pages "
+        "split between processes). Modes: lazy (heavy modules load on "
+        "first use), eager (every worker imports them at startup) and "
+        "preload (the master imports them once before forking)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mode", action="append", choices=MODES, dest="modes")
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--path", action="append", dest="paths",
+            help="Requested in order by every worker (default: /api/datasets/)"
+        )
+        parser.add_argument("--output", help="Write results to this JSON file")
+        parser.add_argument("--compare", help="Earlier --output file to compare against")
+
+    def handle(self, *args, **options):
+        if not hasattr(os, "fork"):
+            raise CommandError("bench_startup needs os.fork (Linux / macOS)")
+
+        modes = options["modes"] or MODES
+        paths = options["paths"] or ["/api/datasets/"]
+        self.stdout.write(
+            f"{options['workers']} workers x {options['repeat']} runs, requesting {', '.join(paths)}"
+        )
+
+        results = {}
+        for mode in modes:
+            runs = [self._probe(mode, paths, options["workers"]) for _ in range(options["repeat"])]
+            results[mode] = self._summarize(runs, paths)
+            self._print(mode, results[mode])
+
+        if options["output"]:
+            write_results(options["output"], "bench_startup", options, results)
+            self.stdout.write(f"\nResults written to {options['output']}")
+        if options["compare"]:
+            print_comparison(self.stdout, self.style, results, options["compare"])
+
+    def _probe(self, mode, paths, workers):
+        command = [sys.executable, "-m", "equipment.startup", mode, "--workers", str(workers)]
+        for path in paths:
+            command += ["--path", path]
+
+        completed = subprocess.run(command, cwd=settings.BASE_DIR, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise CommandError(f"Startup probe failed:\n{completed.stderr}")
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def _summarize(self, runs, paths):
+        workers = [w for run in runs for w in run["workers"]]
+
+        def median(values):
+            values = [v for v in values if v is not None]
+            return round(statistics.median(values), 1) if values else None
+
+        return {
+            "count": len(workers),
+            # p50 of fork -> all first responses, the figure --compare tracks
+            "p50_ms": median([w["first_response_ms"] for w in workers]),
+            "master_ms": median([r["master_ms"] for r in runs]),
+            "master_rss_mb": median([r["master"]["rss_mb"] for r in runs]),
+            "startup_ms": median([w["startup_ms"] for w in workers]),
+            "requests_ms": {
+                path: median([w["requests"][i]["ms"] for w in workers])
+                for i, path in enumerate(paths)
+            },
+            "rss_mb": median([w["rss_mb"] for w in workers]),
+            "pss_mb": median([w["pss_mb"] for w in workers]),
+            "libraries": sorted({lib for w in workers for lib in w["libraries"]}),
+        }
+
+    def _print(self, mode, summary):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {mode}"))
+        self.stdout.write(f"  master load        {summary['master_ms']:9.1f} ms")
+        self.stdout.write(f"  worker startup     {summary['startup_ms']:9.1f} ms")
+        for path, ms in summary["requests_ms"].items():
+            self.stdout.write(f"  first response     {ms:9.1f} ms  {path}")
+        self.stdout.write(f"  time to responses  {summary['p50_ms']:9.1f} ms")
+        self.stdout.write(f"  worker RSS / PSS   {summary['rss_mb']} / {summary['pss_mb']} MiB")
+        self.stdout.write(f"  loaded             {', '.join(summary['libraries']) or '-'}")
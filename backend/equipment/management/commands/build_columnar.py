@@ -0,0 +1,67 @@
+import time
+
+import pandas as pd
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from equipment.columnar import ColumnWriter, open_store
+from equipment.ingest import RECORD_FIELDS
+from equipment.models import DatasetUpload, EquipmentRecord
+
+
+CHUNK_ROWS = 50000
+
+
+class Command(BaseCommand):
+    help = (
+        "Write column stores for datasets that do not have one yet, e.g. "
+        "those uploaded before EQUIPMENT_COLUMNAR_STORE was enabled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset_ids", nargs="*", type=int)
+        parser.add_argument("--force", action="store_true", help="Rebuild existing stores")
+
+    def handle(self, *args, **options):
+        ids = options["dataset_ids"] or list(
+            DatasetUpload.objects.order_by("id").values_list("id", flat=True)
+        )
+
+        for dataset_id in ids:
+            if open_store(dataset_id) is not None and not options["force"]:
+                self.stdout.write(f"dataset {dataset_id}: up to date")
+                continue
+
+            started = time.perf_counter()
+            rows = self._build(dataset_id)
+            self.stdout.write(
+                f"dataset {dataset_id}: {rows} rows in {time.perf_counter() - started:.2f}s"
+            )
+
+    def _build(self, dataset_id):
+        writer = ColumnWriter()
+        lookups = ["type__name" if f == "type" else f for f in RECORD_FIELDS]
+        rows = (
+            EquipmentRecord.objects
+            .filter(dataset_id=dataset_id)
+            .order_by("id")
+            .values_list(*lookups)
+            .iterator(chunk_size=CHUNK_ROWS)
+        )
+
+        try:
+            with transaction.atomic():
+                chunk = []
+                for row in rows:
+                    chunk.append(row)
+                    if len(chunk) >= CHUNK_ROWS:
+                        writer.append(pd.DataFrame(chunk, columns=RECORD_FIELDS))
+                        chunk = []
+                writer.append(pd.DataFrame(chunk, columns=RECORD_FIELDS))
+                writer.finish(dataset_id)
+        except BaseException:
+            writer.discard()
+            raise
+
+        return writer.rows
@@ -0,0 +1,123 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+# Worker-side helpers import Django code lazily so they also work when
+# worker processes are spawned rather than forked.
+
+def _init_worker():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+        django.setup()
+
+    # Inherited connections must not be shared with the parent
+    connections.close_all()
+
+    # Pay the report modules' import cost (pdf_utils pulls in stats and
+    # pandas) and matplotlib / ReportLab font caches once per worker, so
+    # the first report's timing is not skewed
+    import equipment.pdf_utils  # noqa: F401
+    import equipment.reports  # noqa: F401
+
+    from io import BytesIO
+    from matplotlib.figure import Figure
+    from reportlab.platypus import SimpleDocTemplate, Paragraph
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    fig = Figure(figsize=(1, 1))
+    fig.subplots().pie([1, 1])
+    fig.add_subplot(111, projection="3d")
+    fig.savefig(BytesIO(), format="png")
+
+    SimpleDocTemplate(BytesIO()).build(
+        [Paragraph("warm-up", getSampleStyleSheet()["Normal"])]
+    )
+
+
+def _render(dataset_id, force):
+    from equipment.models import DatasetUpload
+    from equipment.reports import delete_reports, get_report
+
+    started = time.perf_counter()
+    try:
+        dataset = DatasetUpload.objects.get(id=dataset_id)
+        if force:
+            delete_reports(dataset_id)
+        path, _ = get_report(dataset)
+        return dataset_id, time.perf_counter() - started, path, None
+    except Exception as e:
+        return dataset_id, time.perf_counter() - started, None, str(e)
+
+
+class Command(BaseCommand):
+    help = "Render cached PDF reports for datasets in parallel worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "dataset_ids",
+            nargs="*",
+            type=int,
+            help="Datasets to render (default: all datasets)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes (default: CPU count)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-render reports that are already cached",
+        )
+
+    def handle(self, *args, **options):
+        from equipment.models import DatasetUpload
+
+        dataset_ids = options["dataset_ids"] or list(
+            DatasetUpload.objects.order_by("-uploaded_at").values_list("id", flat=True)
+        )
+        if not dataset_ids:
+            self.stdout.write("No datasets to render.")
+            return
+
+        workers = max(1, min(options["workers"], len(dataset_ids)))
+        self.stdout.write(f"Rendering {len(dataset_ids)} report(s) with {workers} worker(s)")
+
+        # Forked workers must not inherit open DB connections
+        connections.close_all()
+
+        started = time.perf_counter()
+        results = []
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(_render, i, options["force"]) for i in dataset_ids]
+            for future in as_completed(futures):
+                dataset_id, seconds, path, error = future.result()
+                results.append((dataset_id, seconds, error))
+
+                if error:
+                    self.stderr.write(f"  dataset {dataset_id}: FAILED after {seconds * 1000:.0f} ms ({error})")
+                else:
+                    self.stdout.write(f"  dataset {dataset_id}: {seconds * 1000:8.0f} ms  {path}")
+
+        wall = time.perf_counter() - started
+        timings = sorted(seconds for _, seconds, error in results if not error)
+        failed = sum(1 for *_, error in results if error)
+
+        self.stdout.write(f"Rendered {len(timings)} report(s), {failed} failed, in {wall:.2f}s wall")
+        if timings:
+            total = sum(timings)
+            self.stdout.write(
+                f"  per report: min {timings[0] * 1000:.0f} ms, "
+                f"mean {total / len(timings) * 1000:.0f} ms, "
+                f"max {timings[-1] * 1000:.0f} ms; "
+                f"effective parallelism x{total / wall:.1f}"
+            )
@@ -0,0 +1,127 @@
+import io
+import random
+import threading
+import time
+
+import numpy as np
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connection
+
+from equipment.ingest import ingest_csv
+from equipment.models import DatasetUpload, EquipmentRecord
+from equipment.retention import delete_dataset
+from equipment.synthetic import synthetic_csv
+
+
+class Command(BaseCommand):
+    help = (
+        "Mixed load against the configured database: writer threads ingest "
+        "synthetic CSVs while reader threads page through records and list "
+        "datasets. Reports throughput, read latency and lock errors, then "
+        "deletes the datasets it created. Compare SQLite profiles with "
+        "SQLITE_TUNING=0 and SQLITE_PATH pointing at a scratch file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+        parser.add_argument("--rows", type=int, default=20000, help="Rows per upload")
+
+    def handle(self, *args, **options):
+        db = settings.DATABASES["default"]
+        self.stdout.write(f"Database: {db['ENGINE']} {db['NAME']}")
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode")
+                self.stdout.write(f"  journal_mode={cursor.fetchone()[0]}")
+
+        payload = synthetic_csv(options["rows"])
+        self.created = []
+        self.uploads = 0
+        self.reads = []
+        self.errors = {"write": 0, "read": 0}
+        self.lock = threading.Lock()
+
+        # Readers need something to read from the start
+        self._upload(payload)
+
+        deadline = time.perf_counter() + options["duration"]
+        threads = [
+            threading.Thread(target=self._writer, args=(payload, deadline))
+            for _ in range(options["writers"])
+        ] + [
+            threading.Thread(target=self._reader, args=(deadline, seed))
+            for seed in range(options["readers"])
+        ]
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        self._report(elapsed, options["rows"])
+
+        for dataset_id in self.created:
+            delete_dataset(dataset_id)
+
+    def _upload(self, payload):
+        dataset, _ = ingest_csv(io.BytesIO(payload), "load_test.csv")
+        with self.lock:
+            self.created.append(dataset.id)
+            self.uploads += 1
+
+    def _writer(self, payload, deadline):
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    self._upload(payload)
+                except OperationalError:
+                    with self.lock:
+                        self.errors["write"] += 1
+        finally:
+            close_old_connections()
+
+    def _reader(self, deadline, seed):
+        rng = random.Random(seed)
+        try:
+            while time.perf_counter() < deadline:
+                dataset_id = rng.choice(self.created)
+                after = rng.randrange(EquipmentRecord.objects.filter(dataset_id=dataset_id).count() or 1)
+
+                started = time.perf_counter()
+                try:
+                    list(DatasetUpload.objects.order_by("-uploaded_at")[:5])
+                    list(
+                        EquipmentRecord.objects.filter(dataset_id=dataset_id)
+                        .order_by("id")
+                        .values_list("id", "equipment_name", "type__name", "flowrate")[after:after + 100]
+                    )
+                except OperationalError:
+                    with self.lock:
+                        self.errors["read"] += 1
+                    continue
+
+                with self.lock:
+                    self.reads.append(time.perf_counter() - started)
+        finally:
+            close_old_connections()
+
+    def _report(self, elapsed, rows):
+        self.stdout.write(
+            f"Writes: {self.uploads - 1} uploads, "
+            f"{(self.uploads - 1) * rows / elapsed:,.0f} rows/s"
+        )
+        if self.reads:
+            latency = np.percentile(self.reads, [50, 95, 99]) * 1000
+            self.stdout.write(
+                f"Reads:  {len(self.reads) / elapsed:,.0f} req/s, "
+                f"p50 {latency[0]:.1f} ms, p95 {latency[1]:.1f} ms, p99 {latency[2]:.1f} ms"
+            )
+        self.stdout.write(
+            f"Lock errors: {self.errors['write']} write, {self.errors['read']} read"
+        )
@@ -0,0 +1,166 @@
+import http.client
+import io
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import (
+    ThreadedWSGIServer,
+    WSGIRequestHandler,
+    get_internal_wsgi_application,
+)
+from django.test import override_settings
+
+from equipment.benchmarks import format_summary, latency_summary, print_comparison, write_results
+from equipment.ingest import ingest_csv
+from equipment.retention import delete_dataset
+from equipment.synthetic import synthetic_csv
+
+
+# (name, path, weight); {id} is the dataset under test
+ENDPOINTS = [
+    ("datasets", "/api/datasets/", 2),
+    ("records page", "/api/datasets/{id}/records/?limit=100", 4),
+    ("records columns", "/api/datasets/{id}/records/?layout=columns&limit=1000", 2),
+    ("records filtered", "/api/datasets/{id}/records/?type=Pump&min_pressure=5&limit=500", 2),
+    ("stats", "/api/datasets/{id}/stats/", 1),
+    ("binned", "/api/datasets/{id}/binned/", 1),
+]
+
+
+class QuietHandler(WSGIRequestHandler):
+    # Nagle plus delayed ACKs would add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrent HTTP load against the read endpoints. Without --url a "
+        "threaded Django server is started in-process and a synthetic "
+        "dataset is ingested (and deleted afterwards). Reports p50/p95/p99 "
+        "latency and throughput per endpoint; --output writes them as JSON "
+        "and --compare prints the change against an earlier run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", help="Server to load, e.g. http://127.0.0.1:8000 (needs --dataset)")
+        parser.add_argument("--dataset", type=int, help="Dataset id to read")
+        parser.add_argument("--rows", type=int, default=50000, help="Rows of the seeded dataset")
+        parser.add_argument("--types", type=int, default=6, help="Distinct equipment types")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+        parser.add_argument("--output", help="Write results to this JSON file")
+        parser.add_argument("--compare", help="Earlier --output file to compare against")
+
+    def handle(self, *args, **options):
+        if options["url"] and options["dataset"] is None:
+            raise CommandError("--url needs --dataset")
+
+        server = None
+        seeded = None
+        try:
+            url = options["url"]
+            if not url:
+                server = self._start_server()
+                url = f"http://127.0.0.1:{server.server_port}"
+
+            dataset_id = options["dataset"]
+            if dataset_id is None:
+                seeded = self._seed(options)
+                dataset_id = seeded
+
+            self.stdout.write(
+                f"Loading {url} (dataset {dataset_id}) with {options['concurrency']} "
+                f"clients for {options['duration']:.0f}s"
+            )
+            results = self._run(url, dataset_id, options)
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+            if seeded is not None:
+                delete_dataset(seeded)
+
+        if options["output"]:
+            write_results(options["output"], "load_test_http", options, results)
+            self.stdout.write(f"\nResults written to {options['output']}")
+        if options["compare"]:
+            print_comparison(self.stdout, self.style, results, options["compare"])
+
+    def _start_server(self):
+        server = ThreadedWSGIServer(("127.0.0.1", 0), QuietHandler, allow_reuse_address=False)
+        server.set_app(get_internal_wsgi_application())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def _seed(self, options):
+        with override_settings(EQUIPMENT_RETENTION_ON_UPLOAD=False, EQUIPMENT_DEDUPLICATE_UPLOADS=False):
+            dataset, _ = ingest_csv(
+                io.BytesIO(synthetic_csv(options["rows"], options["types"])),
+                "load_test_http.csv",
+            )
+        return dataset.id
+
+    def _run(self, url, dataset_id, options):
+        self.samples = {name: [] for name, _, _ in ENDPOINTS}
+        self.errors = {name: 0 for name, _, _ in ENDPOINTS}
+        self.lock = threading.Lock()
+
+        deadline = time.perf_counter() + options["duration"]
+        threads = [
+            threading.Thread(target=self._client, args=(url, dataset_id, deadline, seed))
+            for seed in range(options["concurrency"])
+        ]
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        results = {}
+        for name, samples in self.samples.items():
+            results[name] = {**latency_summary(samples, elapsed), "errors": self.errors[name]}
+            self.stdout.write(f"  {name:<20} {format_summary(results[name])}  {self.errors[name]} errors")
+
+        everything = [s for samples in self.samples.values() for s in samples]
+        results["total"] = {**latency_summary(everything, elapsed), "errors": sum(self.errors.values())}
+        self.stdout.write(f"  {'total':<20} {format_summary(results['total'])}  {results['total']['errors']} errors")
+        return results
+
+    def _client(self, url, dataset_id, deadline, seed):
+        """One keep-alive connection issuing weighted random requests."""
+        rng = random.Random(seed)
+        target = urlsplit(url)
+        names = [name for name, _, _ in ENDPOINTS]
+        paths = [path.format(id=dataset_id) for _, path, _ in ENDPOINTS]
+        weights = [weight for _, _, weight in ENDPOINTS]
+        conn = http.client.HTTPConnection(target.hostname, target.port, timeout=60)
+
+        try:
+            while time.perf_counter() < deadline:
+                i = rng.choices(range(len(ENDPOINTS)), weights)[0]
+                started = time.perf_counter()
+                try:
+                    conn.request("GET", paths[i])
+                    response = conn.getresponse()
+                    response.read()
+                    ok = response.status < 400
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    ok = False
+                elapsed = time.perf_counter() - started
+
+                with self.lock:
+                    if ok:
+                        self.samples[names[i]].append(elapsed)
+                    else:
+                        self.errors[names[i]] += 1
+        finally:
+            conn.close()
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from equipment.retention import expired_dataset_ids, get_policy, prune
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete datasets outside the retention window (newest --keep, and/or "
+        "newer than --days), their records and cached reports."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep", type=int, help="Keep the N newest datasets")
+        parser.add_argument("--days", type=int, help="Keep datasets uploaded in the last N days")
+        parser.add_argument("--batch-size", type=int, help="Records deleted per transaction")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the datasets that would be deleted",
+        )
+
+    def handle(self, *args, **options):
+        keep, days = options["keep"], options["days"]
+        if keep is None and days is None:
+            keep, days = get_policy()
+
+        if options["dry_run"]:
+            ids = expired_dataset_ids(keep, days)
+            self.stdout.write(f"Would delete {len(ids)} dataset(s): {ids}")
+            return
+
+        started = time.perf_counter()
+        result = prune(keep, days, options["batch_size"])
+
+        self.stdout.write(
+            f"Deleted {len(result['datasets'])} dataset(s) {result['datasets']}, "
+            f"{result['records']} record(s), "
+            f"{result['orphan_reports']} orphaned report(s) and "
+            f"{result['upload_sessions']} stale upload session(s) "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
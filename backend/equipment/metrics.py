@@ -0,0 +1,298 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+DEFAULT_PROFILE_INTERVAL_MS = 5
+
+SECONDS_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+QUERY_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100, 500, 1000]
+
+
+def is_enabled():
+    return getattr(settings, "EQUIPMENT_METRICS", True)
+
+
+def server_timing_enabled():
+    return getattr(settings, "EQUIPMENT_SERVER_TIMING", True)
+
+
+def get_profile_threshold_ms():
+    """Requests at least this slow get a profile dump; None disables profiling."""
+    return getattr(settings, "EQUIPMENT_PROFILE_SLOW_MS", None)
+
+
+def get_profile_interval():
+    return getattr(settings, "EQUIPMENT_PROFILE_INTERVAL_MS", DEFAULT_PROFILE_INTERVAL_MS) / 1000
+
+
+def get_profile_dir():
+    path = str(getattr(settings, "EQUIPMENT_PROFILE_DIR", settings.BASE_DIR / "profiles"))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+# ----------------------------
+# Prometheus metrics
+# ----------------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    In-process Prometheus histogram. Each worker process keeps its own
+    series, so scrape every worker (or run one) to see all traffic.
+    """
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        with self.lock:
+            series = self.series.get(labelvalues)
+            if series is None:
+                series = self.series[labelvalues] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            series = {key: (list(b), s, c) for key, (b, s, c) in self.series.items()}
+
+        for values, (buckets, total, count) in sorted(series.items()):
+            for bound, hits in [*zip(self.buckets, buckets), ("+Inf", count)]:
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, values, le)} {hits}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, values)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, values)} {count}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "equipment_http_request_duration_seconds",
+    "Time to produce a response, by route.",
+    ["method", "route", "status"],
+    SECONDS_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "equipment_http_request_queries",
+    "SQL queries per request, by route.",
+    ["method", "route"],
+    QUERY_BUCKETS,
+)
+PHASE_SECONDS = Histogram(
+    "equipment_phase_duration_seconds",
+    "Time spent in each timed phase per request or background job.",
+    ["phase"],
+    SECONDS_BUCKETS,
+)
+
+REGISTRY = [REQUEST_SECONDS, REQUEST_QUERIES, PHASE_SECONDS]
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# ----------------------------
+# Timing spans
+# ----------------------------
+_current = ContextVar("equipment_timings", default=None)
+
+
+class Timings:
+    """Phase durations and SQL activity of one request or background job."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = {}
+        self.queries = 0
+        self.db_seconds = 0.0
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def add(self, name, seconds, queries):
+        total = self.spans.setdefault(name, [0.0, 0])
+        total[0] += seconds
+        total[1] += queries
+
+    def count_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_seconds += time.perf_counter() - started
+
+    def server_timing(self):
+        """``Server-Timing`` header value: total, database, then each span."""
+        entries = [
+            f"total;dur={self.elapsed() * 1000:.1f}",
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries"',
+        ]
+        for name, (seconds, queries) in self.spans.items():
+            entries.append(f'{name};dur={seconds * 1000:.1f};desc="{queries} queries"')
+        return ", ".join(entries)
+
+
+def count_query(execute, sql, params, many, context):
+    """
+    Execute wrapper on every database connection. Charges the query to the
+    current request or job, including ORM work an async view runs in a
+    sync_to_async thread, which inherits the context.
+    """
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings.count_query(execute, sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """connection_created receiver; the wrapper list outlives reconnects."""
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+@contextmanager
+def collect():
+    """
+    Collect spans and SQL query counts for the enclosed work, then add the
+    span totals to the phase histogram.
+    """
+    timings = Timings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+        for name, (seconds, _) in timings.spans.items():
+            PHASE_SECONDS.observe(seconds, name)
+
+
+@contextmanager
+def span(name):
+    """
+    Time a phase of the current request or job. Repeated spans of the same
+    name add up; outside ``collect()`` this does nothing.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+
+    queries = timings.queries
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started, timings.queries - queries)
+
+
+def timed(iterable, name):
+    """Iterate ``iterable``, counting the time spent producing items as ``name``."""
+    iterator = iter(iterable)
+    while True:
+        with span(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+# ----------------------------
+# Sampling profiler
+# ----------------------------
+def _fold(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+class Sampler:
+    """
+    Samples the stacks of registered threads every few milliseconds from a
+    background thread, which runs only while some thread is registered.
+    """
+
+    def __init__(self):
+        self.stacks = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self, thread_id):
+        with self.lock:
+            self.stacks[thread_id] = Counter()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+
+    def stop(self, thread_id):
+        with self.lock:
+            return self.stacks.pop(thread_id, Counter())
+
+    def _run(self):
+        interval = get_profile_interval()
+        while True:
+            time.sleep(interval)
+            with self.lock:
+                if not self.stacks:
+                    self.thread = None
+                    return
+                frames = sys._current_frames()
+                for thread_id, counter in self.stacks.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        counter[_fold(frame)] += 1
+
+
+sampler = Sampler()
+
+
+def dump_profile(stacks, method, route, elapsed):
+    """
+    Write sampled stacks in folded format (one ``stack count`` per line),
+    readable by flamegraph.pl and speedscope. Returns the file name.
+    """
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}_{method}_{slug}_{elapsed * 1000:.0f}ms.folded"
+    with open(os.path.join(get_profile_dir(), name), "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    return name
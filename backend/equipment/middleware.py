@@ -0,0 +1,86 @@
+import threading
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .metrics import (
+    REQUEST_QUERIES,
+    REQUEST_SECONDS,
+    collect,
+    dump_profile,
+    get_profile_threshold_ms,
+    is_enabled,
+    sampler,
+    server_timing_enabled,
+)
+
+
+def _route(request):
+    match = getattr(request, "resolver_match", None)
+    return match.route if match is not None else "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Times every request and counts its SQL queries. Results go into the
+    histograms behind /api/metrics/ and a ``Server-Timing`` header listing
+    the database time and each span the view recorded.
+
+    With EQUIPMENT_PROFILE_SLOW_MS set, requests are stack-sampled and those
+    at least that slow are written to EQUIPMENT_PROFILE_DIR.
+
+    Streaming responses are timed up to the first byte.
+
+    Runs natively under ASGI too, so async views stay on the event loop;
+    there the stack sampler is off, since one thread serves many requests.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not is_enabled():
+            return self.get_response(request)
+
+        threshold = get_profile_threshold_ms()
+        thread_id = threading.get_ident()
+        if threshold is not None:
+            sampler.start(thread_id)
+
+        try:
+            with collect() as timings:
+                response = self.get_response(request)
+        finally:
+            stacks = sampler.stop(thread_id) if threshold is not None else None
+
+        return self.record(request, response, timings, stacks, threshold)
+
+    async def __acall__(self, request):
+        if not is_enabled():
+            return await self.get_response(request)
+
+        with collect() as timings:
+            response = await self.get_response(request)
+
+        return self.record(request, response, timings)
+
+    def record(self, request, response, timings, stacks=None, threshold=None):
+        elapsed = timings.elapsed()
+        route = _route(request)
+        REQUEST_SECONDS.observe(elapsed, request.method, route, str(response.status_code))
+        REQUEST_QUERIES.observe(timings.queries, request.method, route)
+
+        server_timing = timings.server_timing() if server_timing_enabled() else None
+        if stacks and elapsed * 1000 >= threshold:
+            name = dump_profile(stacks, request.method, route, elapsed)
+            if server_timing is not None:
+                server_timing += f', profile;desc="{name}"'
+
+        if server_timing is not None:
+            response["Server-Timing"] = server_timing
+        return response
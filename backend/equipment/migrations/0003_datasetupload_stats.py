@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0002_ingestionjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasetupload',
+            name='stats',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,84 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def forwards(apps, schema_editor):
+    EquipmentType = apps.get_model("equipment", "EquipmentType")
+    EquipmentRecord = apps.get_model("equipment", "EquipmentRecord")
+
+    names = EquipmentRecord.objects.values_list("type", flat=True).distinct()
+    for name in names:
+        equipment_type, _ = EquipmentType.objects.get_or_create(name=name)
+        EquipmentRecord.objects.filter(type=name).update(equipment_type=equipment_type)
+
+
+def backwards(apps, schema_editor):
+    EquipmentType = apps.get_model("equipment", "EquipmentType")
+    EquipmentRecord = apps.get_model("equipment", "EquipmentRecord")
+
+    for equipment_type in EquipmentType.objects.all():
+        EquipmentRecord.objects.filter(equipment_type=equipment_type).update(type=equipment_type.name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0003_datasetupload_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipmentType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+
+        # Move the free-text type column onto the lookup table. The old
+        # column is made nullable first so the migration can be reversed.
+        migrations.AlterField(
+            model_name='equipmentrecord',
+            name='type',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='equipmentrecord',
+            name='equipment_type',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='records', to='equipment.equipmenttype'),
+        ),
+        migrations.RunPython(forwards, backwards),
+        migrations.RemoveField(
+            model_name='equipmentrecord',
+            name='type',
+        ),
+        migrations.RenameField(
+            model_name='equipmentrecord',
+            old_name='equipment_type',
+            new_name='type',
+        ),
+        migrations.AlterField(
+            model_name='equipmentrecord',
+            name='type',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='records', to='equipment.equipmenttype'),
+        ),
+
+        # Indexes for the real access patterns
+        migrations.AlterField(
+            model_name='equipmentrecord',
+            name='dataset',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='records', to='equipment.datasetupload'),
+        ),
+        migrations.AddIndex(
+            model_name='datasetupload',
+            index=models.Index(fields=['-uploaded_at'], name='dataset_uploaded_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentrecord',
+            index=models.Index(fields=['dataset', 'id'], name='record_dataset_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentrecord',
+            index=models.Index(fields=['dataset', 'type'], name='record_dataset_type_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0004_equipmenttype_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasetupload',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0005_datasetupload_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasetupload',
+            name='rejected_count',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0007_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestionjob',
+            name='worker',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
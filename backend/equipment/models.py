@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 
 
@@ -13,23 +15,146 @@ class DatasetUpload(models.Model):
     # Store type distribution as JSON like {"Pump": 3, "Valve": 2}
     type_distribution = models.JSONField(default=dict)
 
+    # Overall and per-type mean/std/min/max/percentiles, computed at upload
+    stats = models.JSONField(default=dict, blank=True)
+
+    # Rows that failed validation and were quarantined instead of stored
+    rejected_count = models.IntegerField(default=0)
+
+    # SHA-256 of the uploaded file, to recognise re-uploads of the same CSV
+    content_hash = models.CharField(max_length=64, blank=True, default="", db_index=True)
+
+    class Meta:
+        indexes = [
+            # Dataset list and pruning both order by newest first
+            models.Index(fields=["-uploaded_at"], name="dataset_uploaded_at_idx"),
+        ]
+
     def __str__(self):
         return f"{self.filename} ({self.uploaded_at})"
 
 
+class EquipmentType(models.Model):
+    # Lookup table: a handful of type names repeated across millions of rows
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
 class EquipmentRecord(models.Model):
     dataset = models.ForeignKey(
         DatasetUpload,
         on_delete=models.CASCADE,
-        related_name="records"
+        related_name="records",
+        # Covered by the (dataset, id) index below
+        db_index=False
     )
 
     equipment_name = models.CharField(max_length=255)
-    type = models.CharField(max_length=100)
+    type = models.ForeignKey(
+        EquipmentType,
+        on_delete=models.PROTECT,
+        related_name="records",
+        # Covered by the (dataset, type) index below
+        db_index=False
+    )
 
     flowrate = models.FloatField()
     pressure = models.FloatField()
     temperature = models.FloatField()
 
+    class Meta:
+        indexes = [
+            # Per-dataset scans, keyset pagination and ordered exports
+            models.Index(fields=["dataset", "id"], name="record_dataset_id_idx"),
+            # ?type= filters and per-type aggregates within a dataset
+            models.Index(fields=["dataset", "type"], name="record_dataset_type_idx"),
+        ]
+
     def __str__(self):
         return self.equipment_name
+
+
+class IngestionJob(models.Model):
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    filename = models.CharField(max_length=255)
+    staged_path = models.CharField(max_length=500)
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    rows_processed = models.IntegerField(default=0)
+    rows_per_second = models.FloatField(null=True, blank=True)
+
+    dataset = models.ForeignKey(
+        DatasetUpload,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="jobs"
+    )
+    error = models.TextField(blank=True)
+
+    # Process whose worker pool runs the job; see jobs.worker_id()
+    worker = models.CharField(max_length=100, blank=True)
+
+    def __str__(self):
+        return f"Job {self.id}: {self.filename} ({self.status})"
+
+
+class UploadSession(models.Model):
+    """A resumable upload: chunks are appended to a staging file by offset."""
+    STATUS_OPEN = "open"
+    STATUS_FINALIZED = "finalized"
+
+    STATUS_CHOICES = [
+        (STATUS_OPEN, "Open"),
+        (STATUS_FINALIZED, "Finalized"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filename = models.CharField(max_length=255)
+    staged_path = models.CharField(max_length=500)
+
+    # Declared by the client at init; bytes received so far
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+
+    on_error = models.CharField(max_length=16, blank=True)
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=STATUS_OPEN
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    job = models.ForeignKey(
+        IngestionJob,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="upload_sessions"
+    )
+
+    def __str__(self):
+        return f"Upload {self.id}: {self.filename} ({self.received}/{self.size})"
@@ -7,14 +7,16 @@ from reportlab.lib import colors
 from reportlab.lib.units import inch
 from reportlab.pdfgen import canvas
 from datetime import datetime
+from io import BytesIO
 
-# Add these lines BEFORE importing pyplot
-import matplotlib
-matplotlib.use('Agg')  # Use non-GUI backend to avoid threading issues
-import matplotlib.pyplot as plt
+# Object-oriented Figure API only: pyplot's global figure state is not
+# thread-safe, and each Figure renders with its own Agg canvas
+from matplotlib.figure import Figure
 import numpy as np
 
+from .metrics import span
 from .models import DatasetUpload
+from .stats import ensure_stats
 
 
 def draw_footer(canvas, doc):
@@ -33,11 +35,26 @@ def draw_footer(canvas, doc):
     canvas.restoreState()
 
 
-def generate_dataset_pdf(dataset_id, file_path):
+def figure_to_image(fig, width, height):
+    """Render a Figure to PNG in memory and wrap it as a ReportLab Image."""
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png")
+    buffer.seek(0)
+    return Image(buffer, width=width, height=height)
+
+
+def generate_dataset_pdf(dataset_id):
+    """
+    Build the dataset report and return it as PDF bytes.
+
+    Charts and the document are rendered entirely in memory, so concurrent
+    calls (even for the same dataset) share no files or global state.
+    """
     dataset = DatasetUpload.objects.get(id=dataset_id)
 
+    output = BytesIO()
     doc = SimpleDocTemplate(
-        file_path,
+        output,
         pagesize=A4,
         rightMargin=40,
         leftMargin=40,
@@ -107,22 +124,20 @@ def generate_dataset_pdf(dataset_id, file_path):
     labels = list(dataset.type_distribution.keys())
     values = list(dataset.type_distribution.values())
 
-    plt.figure(figsize=(4, 4))
-    plt.pie(
-        values,
-        labels=labels,
-        autopct="%1.1f%%",
-        startangle=140,
-        shadow=True,
-        explode=[0.05] * len(values)
-    )
-    plt.axis("equal")
-
-    pie_path = file_path.replace(".pdf", "_pie.png")
-    plt.savefig(pie_path)
-    plt.close()
+    with span("charts"):
+        fig = Figure(figsize=(4, 4))
+        ax = fig.subplots()
+        ax.pie(
+            values,
+            labels=labels,
+            autopct="%1.1f%%",
+            startangle=140,
+            shadow=True,
+            explode=[0.05] * len(values)
+        )
+        ax.axis("equal")
 
-    elements.append(Image(pie_path, width=4 * inch, height=4 * inch))
+        elements.append(figure_to_image(fig, width=4 * inch, height=4 * inch))
     elements.append(Spacer(1, 20))
 
    
@@ -139,30 +154,68 @@ def generate_dataset_pdf(dataset_id, file_path):
         dataset.avg_temperature
     ]
 
-    fig = plt.figure(figsize=(6, 4))
-    ax = fig.add_subplot(111, projection="3d")
+    with span("charts"):
+        fig = Figure(figsize=(6, 4))
+        ax = fig.add_subplot(111, projection="3d")
 
-    x_pos = np.arange(len(metrics))
-    dx = dy = np.ones(len(metrics)) * 0.5
-    dz = averages
+        x_pos = np.arange(len(metrics))
+        dx = dy = np.ones(len(metrics)) * 0.5
+        dz = averages
 
-    ax.bar3d(x_pos, np.zeros(len(metrics)), np.zeros(len(metrics)), dx, dy, dz, shade=True)
+        ax.bar3d(x_pos, np.zeros(len(metrics)), np.zeros(len(metrics)), dx, dy, dz, shade=True)
 
-    ax.set_xticks(x_pos)
-    ax.set_xticklabels(metrics)
-    ax.set_zlabel("Average Value")
-    ax.set_title("3D Average Parameter Analysis")
+        ax.set_xticks(x_pos)
+        ax.set_xticklabels(metrics)
+        ax.set_zlabel("Average Value")
+        ax.set_title("3D Average Parameter Analysis")
 
-    bar_path = file_path.replace(".pdf", "_3d_bar.png")
-    plt.tight_layout()
-    plt.savefig(bar_path)
-    plt.close()
+        fig.tight_layout()
 
-    elements.append(Image(bar_path, width=5.5 * inch, height=3.5 * inch))
+        elements.append(figure_to_image(fig, width=5.5 * inch, height=3.5 * inch))
+    elements.append(Spacer(1, 20))
+
+    # ---------- PER-TYPE STATISTICS ----------
+    elements.append(Paragraph("Per-Type Statistics (mean / min - max)", section_style))
+    elements.append(Spacer(1, 8))
+
+    def describe(summary):
+        if not summary:
+            return "-"
+        return (
+            f"{summary['mean']:.2f}\n"
+            f"{summary['min']:.2f} - {summary['max']:.2f}"
+        )
+
+    stats_data = [["Type", "Count", "Flowrate", "Pressure", "Temperature"]]
+    with span("stats"):
+        by_type = ensure_stats(dataset)["by_type"]
+    for name, group in by_type.items():
+        stats_data.append([
+            name,
+            group["count"],
+            describe(group["flowrate"]),
+            describe(group["pressure"]),
+            describe(group["temperature"]),
+        ])
+
+    stats_table = Table(stats_data, colWidths=[110, 60, 100, 100, 100])
+    stats_table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1F618D")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("FONT", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 1), (-1, -1), 9),
+        ("ALIGN", (1, 1), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ]))
+
+    elements.append(stats_table)
+
+    with span("layout"):
+        doc.build(
+            elements,
+            onFirstPage=draw_footer,
+            onLaterPages=draw_footer
+        )
 
-    
-    doc.build(
-        elements,
-        onFirstPage=draw_footer,
-        onLaterPages=draw_footer
-    )
\ No newline at end of file
+    return output.getvalue()
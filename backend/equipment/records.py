@@ -0,0 +1,233 @@
+import base64
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from django.conf import settings
+from django.db.models import Q
+
+
+# Same order as EquipmentRecordSerializer output
+RECORD_FIELDS = [
+    "id", "equipment_name", "type",
+    "flowrate", "pressure", "temperature", "dataset",
+]
+RANGE_FIELDS = ["flowrate", "pressure", "temperature"]
+SORT_FIELDS = ["id", "equipment_name", "type", "flowrate", "pressure", "temperature"]
+
+# Type a cursor's sort value must have, per ordering field
+SORT_FIELD_TYPES = {
+    "id": int,
+    "equipment_name": str,
+    "type": str,
+    "flowrate": float,
+    "pressure": float,
+    "temperature": float,
+}
+
+DEFAULT_MAX_PAGE_SIZE = 5000
+
+# Public field name -> ORM lookup, where they differ
+COLUMN_LOOKUPS = {"dataset": "dataset_id", "type": "type__name"}
+
+LAYOUTS = ["rows", "columns"]
+
+
+class RecordQueryError(ValueError):
+    pass
+
+
+def get_max_page_size():
+    return int(getattr(settings, "EQUIPMENT_RECORDS_MAX_PAGE_SIZE", DEFAULT_MAX_PAGE_SIZE))
+
+
+def parse_fields(params):
+    """
+    Parse ``?fields=a,b`` into a list of record fields (all by default).
+    ``id`` is always included since cursors are built from it.
+    """
+    raw = params.get("fields")
+    if not raw:
+        return list(RECORD_FIELDS)
+
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in RECORD_FIELDS]
+    if unknown:
+        raise RecordQueryError(f"Unknown fields: {', '.join(unknown)}")
+
+    if "id" not in fields:
+        fields.insert(0, "id")
+    return fields
+
+
+def parse_ordering(params):
+    """Return ``(field, descending)`` from ``?ordering=field`` / ``-field``."""
+    raw = params.get("ordering", "id")
+    descending = raw.startswith("-")
+    field = raw.lstrip("-")
+
+    if field not in SORT_FIELDS:
+        raise RecordQueryError(f"Cannot order by '{field}'")
+    return field, descending
+
+
+def _parse_float(params, key):
+    try:
+        return float(params[key])
+    except ValueError:
+        raise RecordQueryError(f"'{key}' must be a number")
+
+
+def parse_filters(params):
+    """
+    Parse ``?type=Pump,Valve`` and ``?min_<field>=`` / ``?max_<field>=``
+    into ``(types, bounds)``: a list of type names (or None) and
+    ``(field, lookup, value)`` triples with lookup ``gte`` or ``lte``.
+    """
+    types = params.get("type")
+    if types:
+        types = [t.strip() for t in types.split(",")]
+
+    bounds = []
+    for field in RANGE_FIELDS:
+        if params.get(f"min_{field}"):
+            bounds.append((field, "gte", _parse_float(params, f"min_{field}")))
+        if params.get(f"max_{field}"):
+            bounds.append((field, "lte", _parse_float(params, f"max_{field}")))
+
+    return types or None, bounds
+
+
+def filter_records(queryset, params):
+    """Apply the ``parse_filters`` filters to a record queryset."""
+    types, bounds = parse_filters(params)
+
+    if types:
+        queryset = queryset.filter(type__name__in=types)
+    for field, lookup, value in bounds:
+        queryset = queryset.filter(**{f"{field}__{lookup}": value})
+
+    return queryset
+
+
+def encode_cursor(value, pk):
+    payload = json.dumps([value, pk]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def _is_type(value, kind):
+    # bool is an int subclass; JSON floats may come back as ints
+    if isinstance(value, bool):
+        return False
+    if kind is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, kind)
+
+
+def decode_cursor(cursor, field="id"):
+    """
+    ``(value, pk)`` from a cursor made by ``encode_cursor`` for ordering
+    ``field``. Anything else, even well-formed JSON, is a RecordQueryError
+    rather than a bad value handed to the database.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise RecordQueryError("Invalid cursor")
+
+    if not isinstance(payload, list) or len(payload) != 2:
+        raise RecordQueryError("Invalid cursor")
+    value, pk = payload
+    if not _is_type(pk, int) or not _is_type(value, SORT_FIELD_TYPES[field]):
+        raise RecordQueryError("Invalid cursor")
+    return value, pk
+
+
+def paginate_records(queryset, params, fields=RECORD_FIELDS):
+    """
+    Order and keyset-paginate a record queryset into plain value tuples.
+
+    Rows are ordered by ``(ordering field, id)`` and a page resumes strictly
+    after the ``(value, id)`` pair carried in the cursor, so every page is a
+    single index range scan no matter how deep it is. Without ``?limit=``
+    the full ordered queryset is returned.
+
+    Rows come straight from ``values_list`` in ``fields`` order, skipping
+    model instantiation. Returns ``(rows, next_cursor)``.
+    """
+    field, descending = parse_ordering(params)
+    lookup = COLUMN_LOOKUPS.get(field, field)
+    prefix = "-" if descending else ""
+    queryset = queryset.order_by(f"{prefix}{lookup}", f"{prefix}id")
+
+    cursor = params.get("cursor")
+    if cursor:
+        value, pk = decode_cursor(cursor, field)
+        op = "lt" if descending else "gt"
+        if field == "id":
+            queryset = queryset.filter(**{f"id__{op}": pk})
+        else:
+            queryset = queryset.filter(
+                Q(**{f"{lookup}__{op}": value}) | Q(**{lookup: value, f"id__{op}": pk})
+            )
+
+    # The sort value is needed for the cursor even when not projected
+    select = [COLUMN_LOOKUPS.get(f, f) for f in fields]
+    extra = field not in fields
+    if extra:
+        select.append(lookup)
+    queryset = queryset.values_list(*select)
+
+    limit = params.get("limit")
+    if not limit:
+        rows = list(queryset)
+        next_cursor = None
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise RecordQueryError("'limit' must be an integer")
+        if limit < 1:
+            raise RecordQueryError("'limit' must be positive")
+        limit = min(limit, get_max_page_size())
+
+        rows = list(queryset[:limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            value = last[-1] if extra else last[fields.index(field)]
+            next_cursor = encode_cursor(value, last[fields.index("id")])
+
+    if extra:
+        rows = [row[:-1] for row in rows]
+    return rows, next_cursor
+
+
+def parse_layout(params):
+    layout = params.get("layout", "rows")
+    if layout not in LAYOUTS:
+        raise RecordQueryError(f"'layout' must be one of: {', '.join(LAYOUTS)}")
+    return layout
+
+
+def rows_to_records(fields, rows):
+    """``[{"id": 1, "flowrate": 2.0, ...}, ...]``"""
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def rows_to_columns(fields, rows):
+    """``{"id": [1, 2, ...], "flowrate": [2.0, 3.1, ...], ...}``"""
+    if not rows:
+        return {f: [] for f in fields}
+    return {f: list(column) for f, column in zip(fields, zip(*rows))}
+
+
+def dumps(payload):
+    """Encode a payload to JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode()
@@ -0,0 +1,114 @@
+import glob
+import hashlib
+import json
+import os
+import uuid
+from contextlib import suppress
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .metrics import collect
+from .models import DatasetUpload
+
+
+# Bump when the PDF layout changes so cached reports are rebuilt
+REPORT_VERSION = 2
+
+
+def get_report_dir():
+    path = getattr(
+        settings,
+        "EQUIPMENT_REPORT_DIR",
+        os.path.join(settings.BASE_DIR, "pdf_reports"),
+    )
+    os.makedirs(path, exist_ok=True)
+    return str(path)
+
+
+def report_hash(dataset):
+    """
+    Digest of everything the report is rendered from. Datasets never change
+    after upload, so this only moves when REPORT_VERSION does.
+    """
+    content = json.dumps(
+        [
+            REPORT_VERSION,
+            dataset.id,
+            dataset.filename,
+            dataset.uploaded_at.isoformat(),
+            dataset.total_count,
+            dataset.avg_flowrate,
+            dataset.avg_pressure,
+            dataset.avg_temperature,
+            dataset.type_distribution,
+        ],
+        sort_keys=True,
+    )
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+def report_path(dataset_id, digest):
+    return os.path.join(get_report_dir(), f"dataset_{dataset_id}_{digest}.pdf")
+
+
+def get_report(dataset):
+    """
+    Return ``(path, digest)`` of the cached report for ``dataset``,
+    rendering it first if needed.
+    """
+    digest = report_hash(dataset)
+    path = report_path(dataset.id, digest)
+
+    if not os.path.exists(path):
+        # matplotlib and ReportLab load on the first render, not at startup
+        from .pdf_utils import generate_dataset_pdf
+
+        write_report(path, generate_dataset_pdf(dataset.id))
+
+        delete_reports(dataset.id, keep=path)
+
+        # The dataset may have been pruned while rendering
+        if not DatasetUpload.objects.filter(id=dataset.id).exists():
+            delete_reports(dataset.id)
+
+    return path, digest
+
+
+def write_report(path, content):
+    """
+    Write under a unique name and move into place so readers never see a
+    half-written file.
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    finally:
+        # Already gone once moved into place
+        with suppress(FileNotFoundError):
+            os.remove(tmp_path)
+
+
+def prebuild_report(dataset_id):
+    """Render a dataset's report ahead of the first download."""
+    try:
+        with collect():
+            get_report(DatasetUpload.objects.get(id=dataset_id))
+    except DatasetUpload.DoesNotExist:
+        pass
+    finally:
+        close_old_connections()
+
+
+def delete_reports(dataset_id, keep=None):
+    """
+    Remove cached reports of a dataset, optionally sparing ``keep``. Safe to
+    run alongside another delete or rebuild of the same dataset's reports.
+    """
+    pattern = os.path.join(get_report_dir(), f"dataset_{dataset_id}_*.pdf")
+    for path in glob.glob(pattern):
+        if path != keep:
+            with suppress(FileNotFoundError):
+                os.remove(path)
@@ -0,0 +1,138 @@
+import glob
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .caching import invalidate
+from .events import publish
+from .models import DatasetUpload, EquipmentRecord, UploadSession
+from .reports import delete_reports, get_report_dir
+from .validation import delete_quarantine
+
+
+DEFAULT_KEEP = 5
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_UPLOAD_SESSION_TTL_HOURS = 24
+
+
+def get_policy():
+    """``(keep, days)`` from settings; either may be None to disable it."""
+    keep = getattr(settings, "EQUIPMENT_RETENTION_KEEP", DEFAULT_KEEP)
+    days = getattr(settings, "EQUIPMENT_RETENTION_DAYS", None)
+    return keep, days
+
+
+def get_batch_size():
+    return int(getattr(settings, "EQUIPMENT_RETENTION_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+
+
+def expired_dataset_ids(keep=None, days=None):
+    """
+    Ids of datasets outside the retention window: anything beyond the
+    ``keep`` newest uploads, plus anything older than ``days``.
+    """
+    ids = set()
+    newest_first = DatasetUpload.objects.order_by("-uploaded_at", "-id")
+
+    if keep is not None:
+        ids.update(newest_first.values_list("id", flat=True)[keep:])
+
+    if days is not None:
+        cutoff = timezone.now() - timedelta(days=days)
+        ids.update(newest_first.filter(uploaded_at__lt=cutoff).values_list("id", flat=True))
+
+    return sorted(ids)
+
+
+def delete_dataset(dataset_id, batch_size=None):
+    """
+    Delete a dataset with set-based DELETEs.
+
+    Records go first in id-range batches, each its own short transaction,
+    so the (dataset, id) index drives every DELETE and no batch holds the
+    write lock for long. Returns the number of records deleted.
+    """
+    batch_size = batch_size or get_batch_size()
+    records = EquipmentRecord.objects.filter(dataset_id=dataset_id)
+    bounds = records.aggregate(low=Min("id"), high=Max("id"))
+
+    deleted = 0
+    if bounds["low"] is not None:
+        for start in range(bounds["low"], bounds["high"] + 1, batch_size):
+            with transaction.atomic():
+                count, _ = records.filter(id__gte=start, id__lt=start + batch_size).delete()
+            deleted += count
+
+    # Imported here: the column store module needs NumPy
+    from .columnar import delete_store
+
+    DatasetUpload.objects.filter(id=dataset_id).delete()
+    delete_reports(dataset_id)
+    delete_store(dataset_id)
+    delete_quarantine(dataset_id)
+    invalidate()
+    publish("dataset.pruned", {"dataset_id": dataset_id, "records": deleted})
+    return deleted
+
+
+def delete_orphan_reports():
+    """Remove cached reports whose dataset no longer exists."""
+    name = re.compile(r"dataset_(\d+)_[0-9a-f]+\.pdf")
+    existing = set(DatasetUpload.objects.values_list("id", flat=True))
+
+    removed = 0
+    for path in glob.glob(os.path.join(get_report_dir(), "dataset_*.pdf")):
+        match = name.fullmatch(os.path.basename(path))
+        if match and int(match.group(1)) not in existing:
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def expire_upload_sessions():
+    """Drop chunked uploads left open longer than the TTL, and their files."""
+    ttl = getattr(settings, "EQUIPMENT_UPLOAD_SESSION_TTL_HOURS", DEFAULT_UPLOAD_SESSION_TTL_HOURS)
+    stale = UploadSession.objects.filter(
+        status=UploadSession.STATUS_OPEN,
+        updated_at__lt=timezone.now() - timedelta(hours=ttl),
+    )
+
+    removed = 0
+    for session in stale:
+        if os.path.exists(session.staged_path):
+            os.remove(session.staged_path)
+        session.delete()
+        removed += 1
+    return removed
+
+
+def prune(keep=None, days=None, batch_size=None):
+    """
+    Apply the retention policy (settings by default). Returns a summary of
+    what was removed.
+    """
+    if keep is None and days is None:
+        keep, days = get_policy()
+
+    dataset_ids = expired_dataset_ids(keep, days)
+    records = sum(delete_dataset(i, batch_size) for i in dataset_ids)
+
+    return {
+        "datasets": dataset_ids,
+        "records": records,
+        "orphan_reports": delete_orphan_reports(),
+        "upload_sessions": expire_upload_sessions(),
+    }
+
+
+def prune_in_background():
+    """Retention pass for the worker pool, run after each upload."""
+    try:
+        return prune()
+    finally:
+        close_old_connections()
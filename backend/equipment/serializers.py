@@ -1,18 +1,30 @@
 from rest_framework import serializers
-from .models import DatasetUpload, EquipmentRecord
+from .models import DatasetUpload, EquipmentRecord, IngestionJob
 
 
 class EquipmentRecordSerializer(serializers.ModelSerializer):
+    type = serializers.SlugRelatedField(slug_field="name", read_only=True)
+
     class Meta:
         model = EquipmentRecord
-        fields = "__all__"
+        fields = [
+            "id", "equipment_name", "type",
+            "flowrate", "pressure", "temperature", "dataset",
+        ]
 
 
 class DatasetUploadSerializer(serializers.ModelSerializer):
     class Meta:
         model = DatasetUpload
-        fields = "__all__"
+        # Full statistics are served by the stats endpoint
+        exclude = ["stats"]
 
 
 class CSVUploadSerializer(serializers.Serializer):
     file = serializers.FileField()
+
+
+class IngestionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = IngestionJob
+        exclude = ["staged_path", "worker"]
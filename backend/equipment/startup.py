@@ -0,0 +1,161 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+from importlib import import_module
+
+
+# Modules that pull in NumPy, pandas, PyArrow, matplotlib or ReportLab
+HEAVY_MODULES = [
+    "equipment.ingest",
+    "equipment.stats",
+    "equipment.binning",
+    "equipment.compare",
+    "equipment.exports",
+    "equipment.pdf_utils",
+]
+
+HEAVY_LIBRARIES = ["numpy", "pandas", "pyarrow", "matplotlib", "reportlab"]
+
+
+def preload():
+    """
+    Import the URLconf and every heavy module now. Called from the WSGI
+    module with EQUIPMENT_PRELOAD=1 so that, under ``gunicorn --preload``,
+    the master loads them once and forked workers share the pages.
+    """
+    from django.conf import settings
+
+    import_module(settings.ROOT_URLCONF)
+    for name in HEAVY_MODULES:
+        import_module(name)
+
+
+def loaded_libraries():
+    return [name for name in HEAVY_LIBRARIES if name in sys.modules]
+
+
+# ----------------------------
+# Startup probe, run by manage.py bench_startup as
+# python -m equipment.startup <mode>
+# ----------------------------
+def _memory(pid):
+    """Resident and proportional set size of a process in MiB (Linux only)."""
+    memory = {"rss_mb": None, "pss_mb": None}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, value = line.split(":", 1)
+                if key in ("Rss", "Pss"):
+                    memory[f"{key.lower()}_mb"] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        pass
+    return memory
+
+
+def _get(application, path):
+    from wsgiref.util import setup_testing_defaults
+
+    path, _, query = path.partition("?")
+    environ = {"PATH_INFO": path, "QUERY_STRING": query}
+    setup_testing_defaults(environ)
+
+    status = []
+    body = application(environ, lambda s, headers, exc_info=None: status.append(s))
+    try:
+        for _ in body:
+            pass
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+    return int(status[0].split()[0])
+
+
+def _load(eager):
+    from config.wsgi import application
+
+    if eager:
+        preload()
+    return application
+
+
+def _worker(mode, paths, application, report):
+    """Start like a freshly forked worker, serve ``paths`` once each, report."""
+    started = time.perf_counter()
+    if mode != "preload":
+        application = _load(eager=mode == "eager")
+    result = {
+        "pid": os.getpid(),
+        "startup_ms": round((time.perf_counter() - started) * 1000, 1),
+        "requests": [],
+    }
+
+    for path in paths:
+        request_started = time.perf_counter()
+        status = _get(application, path)
+        result["requests"].append({
+            "path": path,
+            "status": status,
+            "ms": round((time.perf_counter() - request_started) * 1000, 1),
+        })
+
+    result["first_response_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    result["libraries"] = loaded_libraries()
+    os.write(report, (json.dumps(result) + "\n").encode())
+
+
+def probe(mode, paths, workers):
+    """
+    Fork ``workers`` processes the way gunicorn does and time each one from
+    fork to its first responses. ``mode`` is "lazy" (import on demand),
+    "eager" (every worker imports everything) or "preload" (the master
+    imports everything before forking). Memory is read once all workers
+    are up, so PSS reflects pages shared between them.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+    started = time.perf_counter()
+    application = None
+    if mode == "preload":
+        application = _load(eager=True)
+        gc.freeze()
+    master_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    report_r, report_w = os.pipe()
+    release_r, release_w = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(report_r)
+            os.close(release_w)
+            try:
+                _worker(mode, paths, application, report_w)
+                os.read(release_r, 1)
+            finally:
+                os._exit(0)
+        pids.append(pid)
+    os.close(report_w)
+    os.close(release_r)
+
+    with os.fdopen(report_r) as reports:
+        results = [json.loads(reports.readline()) for _ in pids]
+        for result in results:
+            result.update(_memory(result.pop("pid")))
+        os.close(release_w)
+
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    return {"mode": mode, "master_ms": master_ms, "master": _memory(os.getpid()), "workers": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", choices=["lazy", "eager", "preload"])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--path", action="append", dest="paths")
+    args = parser.parse_args()
+    print(json.dumps(probe(args.mode, args.paths or ["/api/datasets/"], args.workers)))
@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+from django.conf import settings
+
+from .columnar import open_store
+from .models import EquipmentRecord
+
+
+STAT_FIELDS = ["flowrate", "pressure", "temperature"]
+PERCENTILES = [25, 50, 75, 95]
+
+DEFAULT_SAMPLE_SIZE = 100000
+BACKFILL_CHUNK_ROWS = 50000
+
+
+def get_sample_size():
+    return int(getattr(settings, "EQUIPMENT_STATS_SAMPLE_SIZE", DEFAULT_SAMPLE_SIZE))
+
+
+class _Group:
+    def __init__(self, width):
+        self.rows = 0
+        self.count = np.zeros(width, dtype="int64")
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+        self.min = np.full(width, np.nan)
+        self.max = np.full(width, np.nan)
+        self.sample = np.empty((0, width))
+        self.sample_keys = np.empty(0)
+
+
+class StatsAccumulator:
+    """
+    Overall and per-type statistics of the numeric columns, built one chunk
+    at a time.
+
+    Per chunk, rows are grouped by type once; count, mean, variance, min and
+    max of every group are merged into running totals (Chan et al.'s
+    parallel variance). Percentiles come from a bottom-k uniform sample of
+    at most ``sample_size`` rows per group, which is exact for groups that
+    fit in the sample and keeps memory bounded for the rest.
+    """
+
+    def __init__(self, sample_size=None, seed=0):
+        self.sample_size = sample_size or get_sample_size()
+        self.rng = np.random.default_rng(seed)
+        self.overall = _Group(len(STAT_FIELDS))
+        self.by_type = {}
+
+    def update(self, df):
+        if not len(df):
+            return
+
+        values = df[STAT_FIELDS].to_numpy(dtype="float64")
+        keys = self.rng.random(len(df))
+
+        self._merge(self.overall, values, keys)
+
+        groups = df.groupby(df["type"].astype(str), sort=False).indices
+        for name, index in groups.items():
+            group = self.by_type.setdefault(name, _Group(len(STAT_FIELDS)))
+            self._merge(group, values[index], keys[index])
+
+    def _merge(self, group, values, keys):
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0)
+        safe_count = np.maximum(count, 1)
+
+        mean = np.where(valid, values, 0).sum(axis=0) / safe_count
+        m2 = (np.where(valid, values - mean, 0) ** 2).sum(axis=0)
+
+        total = group.count + count
+        safe_total = np.maximum(total, 1)
+        delta = mean - group.mean
+
+        group.m2 = group.m2 + m2 + delta ** 2 * group.count * count / safe_total
+        group.mean = group.mean + delta * count / safe_total
+        group.count = total
+        group.rows += len(values)
+
+        group.min = np.fmin(group.min, np.fmin.reduce(values, axis=0))
+        group.max = np.fmax(group.max, np.fmax.reduce(values, axis=0))
+
+        sample = np.concatenate([group.sample, values])
+        sample_keys = np.concatenate([group.sample_keys, keys])
+        if len(sample_keys) > self.sample_size:
+            keep = np.argpartition(sample_keys, self.sample_size)[:self.sample_size]
+            sample, sample_keys = sample[keep], sample_keys[keep]
+        group.sample, group.sample_keys = sample, sample_keys
+
+    def _summarize(self, group):
+        summary = {"count": int(group.rows)}
+
+        for i, field in enumerate(STAT_FIELDS):
+            n = int(group.count[i])
+            if not n:
+                summary[field] = None
+                continue
+
+            column = group.sample[:, i]
+            column = column[~np.isnan(column)]
+            percentiles = np.percentile(column, PERCENTILES)
+
+            summary[field] = {
+                "mean": float(group.mean[i]),
+                "std": float(np.sqrt(group.m2[i] / (n - 1))) if n > 1 else 0.0,
+                "min": float(group.min[i]),
+                "max": float(group.max[i]),
+                **{f"p{p}": float(v) for p, v in zip(PERCENTILES, percentiles)},
+            }
+
+        return summary
+
+    def result(self):
+        by_type = sorted(self.by_type.items(), key=lambda item: -item[1].rows)
+        exact = all(g.rows <= self.sample_size for g in [self.overall, *self.by_type.values()])
+
+        return {
+            "overall": self._summarize(self.overall),
+            "by_type": {name: self._summarize(g) for name, g in by_type},
+            "exact_percentiles": exact,
+        }
+
+
+def _record_frames(dataset):
+    """Frames of (type, *STAT_FIELDS) for a dataset, column store first."""
+    columns = ["type", *STAT_FIELDS]
+
+    store = open_store(dataset.id)
+    if store is not None:
+        types = store.column("type")
+        for start in range(0, store.rows, BACKFILL_CHUNK_ROWS):
+            stop = start + BACKFILL_CHUNK_ROWS
+            frame = pd.DataFrame({f: store.column(f)[start:stop] for f in STAT_FIELDS})
+            frame.insert(0, "type", store.type_names(types[start:stop]))
+            yield frame
+        return
+
+    rows = (
+        EquipmentRecord.objects
+        .filter(dataset=dataset)
+        .values_list("type__name", *STAT_FIELDS)
+        .iterator(chunk_size=BACKFILL_CHUNK_ROWS)
+    )
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= BACKFILL_CHUNK_ROWS:
+            yield pd.DataFrame(chunk, columns=columns)
+            chunk = []
+    yield pd.DataFrame(chunk, columns=columns)
+
+
+def ensure_stats(dataset):
+    """
+    Return ``dataset.stats``, computing and saving it first for datasets
+    uploaded before statistics were collected at ingestion.
+    """
+    if dataset.stats:
+        return dataset.stats
+
+    accumulator = StatsAccumulator()
+    for frame in _record_frames(dataset):
+        accumulator.update(frame)
+
+    dataset.stats = accumulator.result()
+    dataset.save(update_fields=["stats"])
+    return dataset.stats
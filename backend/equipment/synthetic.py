@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from .ingest import COLUMN_MAP, RECORD_FIELDS
+
+
+TYPE_NAMES = [
+    "Pump", "Valve", "Compressor", "HeatExchanger", "Reactor",
+    "Condenser", "Mixer", "Separator", "Boiler", "Column",
+]
+
+# (low, high) of the uniform distribution for each numeric column
+RANGES = {
+    "flowrate": (50.0, 250.0),
+    "pressure": (2.0, 10.0),
+    "temperature": (60.0, 200.0),
+}
+
+
+def type_names(count):
+    if count <= len(TYPE_NAMES):
+        return TYPE_NAMES[:count]
+    return TYPE_NAMES + [f"Type{i}" for i in range(len(TYPE_NAMES), count)]
+
+
+def synthetic_frame(rows, types=6, seed=0, start=0):
+    """
+    Normalized frame of ``rows`` random equipment readings spread over
+    ``types`` equipment types, ready for ``ingest.insert_records``.
+    Equipment names are numbered from ``start``.
+    """
+    rng = np.random.default_rng(seed)
+    names = np.array(type_names(types))
+
+    df = pd.DataFrame({
+        "equipment_name": [f"EQ-{i:07d}" for i in range(start, start + rows)],
+        "type": names[rng.integers(0, len(names), rows)],
+    })
+    for field, (low, high) in RANGES.items():
+        df[field] = rng.uniform(low, high, rows).round(2)
+
+    return df[RECORD_FIELDS]
+
+
+def _csv_headers():
+    return {field: header.title() for header, field in COLUMN_MAP.items()}
+
+
+def synthetic_csv(rows, types=6, seed=0):
+    """``synthetic_frame`` as CSV bytes with the headers the upload expects."""
+    return synthetic_frame(rows, types, seed).rename(columns=_csv_headers()).to_csv(index=False).encode()
+
+
+def write_synthetic_csv(path, rows, types=6, seed=0, chunk_rows=100000):
+    """Write a synthetic upload CSV of any size, ``chunk_rows`` at a time."""
+    with open(path, "w", newline="") as f:
+        for i, start in enumerate(range(0, max(rows, 1), chunk_rows)):
+            frame = synthetic_frame(min(chunk_rows, rows - start), types, seed + i, start)
+            frame.rename(columns=_csv_headers()).to_csv(f, index=False, header=i == 0)
@@ -1,3 +1,506 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 
-# Create your tests here.
+from . import jobs
+from .binning import lttb
+from .caching import generation, invalidate
+from .models import DatasetUpload, EquipmentRecord, EquipmentType, IngestionJob, UploadSession
+from .records import encode_cursor
+from .stats import PERCENTILES, STAT_FIELDS, StatsAccumulator
+
+
+HEADER = "Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+
+
+def make_csv(rows):
+    return (HEADER + "".join(",".join(map(str, row)) + "\n" for row in rows)).encode()
+
+
+def make_dataset(rows, filename="test.csv"):
+    """A dataset with one record per ``(name, type, flowrate, pressure, temperature)``."""
+    dataset = DatasetUpload.objects.create(filename=filename, total_count=len(rows))
+    types = {}
+    for name, type_name, flowrate, pressure, temperature in rows:
+        if type_name not in types:
+            types[type_name], _ = EquipmentType.objects.get_or_create(name=type_name)
+        EquipmentRecord.objects.create(
+            dataset=dataset,
+            equipment_name=name,
+            type=types[type_name],
+            flowrate=flowrate,
+            pressure=pressure,
+            temperature=temperature
+        )
+    return dataset
+
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+class EquipmentTestCase(TestCase):
+    """
+    Per-test caches and file directories, with the background report and
+    retention work turned off so tests only see what they trigger.
+    """
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+
+        override = self.settings(
+            CACHES={
+                alias: {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "LOCATION": f"{self.tmp}-{alias}",
+                }
+                for alias in ["default", "jobs"]
+            },
+            EQUIPMENT_QUARANTINE_DIR=os.path.join(self.tmp, "quarantine"),
+            EQUIPMENT_UPLOAD_STAGING_DIR=os.path.join(self.tmp, "staging"),
+            EQUIPMENT_REPORT_DIR=os.path.join(self.tmp, "reports"),
+            EQUIPMENT_COLUMNAR_DIR=os.path.join(self.tmp, "columnar"),
+            EQUIPMENT_COLUMNAR_STORE=False,
+            EQUIPMENT_REPORT_PREBUILD=False,
+            EQUIPMENT_RETENTION_ON_UPLOAD=False,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def upload(self, content, query="", name="upload.csv"):
+        """POST a CSV to upload-csv/, running the on-commit hooks."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                f"/api/upload-csv/{query}",
+                {"file": SimpleUploadedFile(name, content, content_type="text/csv")}
+            )
+
+
+# ----------------------------
+# Keyset pagination of records
+# ----------------------------
+class RecordCursorTests(EquipmentTestCase):
+    def setUp(self):
+        super().setUp()
+        # Repeated flowrates, so pages must break ties on id
+        self.dataset = make_dataset([
+            (f"P-{i}", "Pump" if i % 2 else "Valve", float(i % 4), 1.0, 20.0)
+            for i in range(10)
+        ])
+        self.url = f"/api/datasets/{self.dataset.id}/records/"
+
+    def walk(self, **params):
+        ids, cursor = [], None
+        while True:
+            query = dict(params, limit=3)
+            if cursor:
+                query["cursor"] = cursor
+            response = self.client.get(self.url, query)
+            self.assertEqual(response.status_code, 200)
+            ids += [r["id"] for r in response.json()["records"]]
+            cursor = response.json()["next_cursor"]
+            if cursor is None:
+                return ids
+
+    def test_pages_cover_every_record_once_in_order(self):
+        expected = list(
+            EquipmentRecord.objects.filter(dataset=self.dataset)
+            .order_by("-flowrate", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(self.walk(ordering="-flowrate"), expected)
+        self.assertEqual(self.walk(ordering="equipment_name", fields="flowrate"), list(
+            EquipmentRecord.objects.filter(dataset=self.dataset)
+            .order_by("equipment_name", "id").values_list("id", flat=True)
+        ))
+
+    def test_malformed_cursors_are_400(self):
+        cursors = {
+            "id": [
+                "not-base64!",
+                raw_cursor({"value": 1}),
+                raw_cursor([1, 2, 3]),
+                raw_cursor(["a", "b"]),
+                raw_cursor([1, True]),
+                raw_cursor([1, 2.5]),
+            ],
+            "flowrate": [raw_cursor(["fast", 1]), raw_cursor([None, 1])],
+            "equipment_name": [raw_cursor([3, 1])],
+        }
+        for ordering, values in cursors.items():
+            for cursor in values:
+                with self.subTest(ordering=ordering, cursor=cursor):
+                    response = self.client.get(
+                        self.url,
+                        {"ordering": ordering, "cursor": cursor, "limit": 3}
+                    )
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(response.json(), {"error": "Invalid cursor"})
+
+    def test_integer_cursor_value_for_float_field(self):
+        response = self.client.get(
+            self.url,
+            {"ordering": "flowrate", "cursor": encode_cursor(1, 0), "limit": 100}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all(r["flowrate"] >= 1 for r in response.json()["records"]))
+
+
+# ----------------------------
+# Row validation: reject / quarantine
+# ----------------------------
+class ValidationTests(EquipmentTestCase):
+    rows = [
+        ("P-1", "Pump", 10, 5, 100),
+        ("P-2", "Pump", "fast", 5, 100),
+        ("V-1", "Valve", 3, -1, 90),
+        ("", "Valve", 4, 2, -300),
+        ("V-2", "Valve", 6, 2, 80),
+    ]
+
+    def test_reject_reports_every_invalid_row(self):
+        response = self.upload(make_csv(self.rows), "?on_error=reject")
+
+        self.assertEqual(response.status_code, 400)
+        report = response.json()
+        self.assertEqual(report["rows_checked"], 5)
+        self.assertEqual(report["invalid_rows"], 3)
+        self.assertEqual(report["errors"], {
+            "equipment_name": {"missing": 1},
+            "flowrate": {"non_numeric": 1},
+            "pressure": {"out_of_range": 1},
+            "temperature": {"out_of_range": 1},
+        })
+        self.assertEqual([e["row"] for e in report["examples"]], [2, 3, 4])
+        self.assertEqual(
+            report["examples"][2]["errors"],
+            "equipment_name: missing; temperature: out_of_range"
+        )
+        self.assertFalse(DatasetUpload.objects.exists())
+
+    def test_quarantine_keeps_valid_rows_and_the_rejected_csv(self):
+        response = self.upload(make_csv(self.rows), "?on_error=quarantine")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["total_count"], 2)
+        self.assertEqual(response.json()["rejected_count"], 3)
+        dataset_id = response.json()["dataset_id"]
+        self.assertEqual(
+            sorted(EquipmentRecord.objects.filter(dataset_id=dataset_id)
+                   .values_list("equipment_name", flat=True)),
+            ["P-1", "V-2"]
+        )
+
+        response = self.client.get(f"/api/datasets/{dataset_id}/rejected/")
+        self.assertEqual(response.status_code, 200)
+        rejected = pd.read_csv(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(rejected["Row"].tolist(), [2, 3, 4])
+        self.assertEqual(rejected["Errors"].tolist()[0], "flowrate: non_numeric")
+
+    def test_unknown_mode_is_400(self):
+        response = self.upload(make_csv(self.rows[:1]), "?on_error=ignore")
+        self.assertEqual(response.status_code, 400)
+
+
+# ----------------------------
+# Duplicate uploads
+# ----------------------------
+class DuplicateUploadTests(EquipmentTestCase):
+    def test_identical_file_returns_the_existing_dataset(self):
+        content = make_csv([("P-1", "Pump", 1, 2, 3), ("V-1", "Valve", 4, 5, 6)])
+
+        first = self.upload(content)
+        self.assertEqual(first.status_code, 201)
+        dataset = DatasetUpload.objects.get(id=first.json()["dataset_id"])
+        self.assertEqual(dataset.content_hash, hashlib.sha256(content).hexdigest())
+
+        second = self.upload(content, name="renamed.csv")
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.json()["duplicate"])
+        self.assertEqual(second.json()["dataset_id"], dataset.id)
+        self.assertEqual(DatasetUpload.objects.count(), 1)
+
+        forced = self.upload(content, "?force=1")
+        self.assertEqual(forced.status_code, 201)
+        self.assertNotEqual(forced.json()["dataset_id"], dataset.id)
+
+    def test_different_content_is_ingested(self):
+        self.upload(make_csv([("P-1", "Pump", 1, 2, 3)]))
+        response = self.upload(make_csv([("P-1", "Pump", 1, 2, 4)]))
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.json()["duplicate"])
+
+
+# ----------------------------
+# Resumable uploads
+# ----------------------------
+class ResumableUploadTests(EquipmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = make_csv([(f"P-{i}", "Pump", i, 2, 3) for i in range(20)])
+        response = self.client.post(
+            "/api/uploads/",
+            {"filename": "big.csv", "size": len(self.content)},
+            content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["offset"], 0)
+        self.url = response.json()["upload_url"]
+
+    def put(self, offset, chunk):
+        return self.client.put(
+            self.url, chunk,
+            content_type="application/octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def finalize(self):
+        return self.client.post(f"{self.url}finalize/")
+
+    def test_chunks_resume_from_the_server_offset(self):
+        half = len(self.content) // 2
+
+        response = self.put(0, self.content[:half])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["offset"], half)
+
+        # A retried chunk is out of step: 409 with the offset to resume from
+        response = self.put(0, self.content[:half])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["offset"], half)
+
+        self.assertEqual(self.client.get(self.url).json()["offset"], half)
+        self.assertEqual(self.finalize().status_code, 409)
+
+        response = self.put(half, self.content[half:] + b"extra")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.put(half, self.content[half:])
+        self.assertEqual(response.json()["offset"], len(self.content))
+
+    def test_finalize_queues_one_job(self):
+        self.put(0, self.content)
+
+        with mock.patch.object(jobs, "get_executor") as get_executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.finalize()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["status"], UploadSession.STATUS_FINALIZED)
+        job = IngestionJob.objects.get(id=response.json()["job_id"])
+        self.assertEqual(job.status, IngestionJob.STATUS_QUEUED)
+        with open(job.staged_path, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+        get_executor.return_value.submit.assert_called_once_with(
+            jobs.run_job, job.id, hashlib.sha256(self.content).hexdigest(), None
+        )
+
+        self.assertEqual(self.finalize().status_code, 409)
+        self.assertEqual(self.put(len(self.content), b"x").status_code, 409)
+
+    def test_failed_job_creation_leaves_the_session_open(self):
+        self.put(0, self.content)
+
+        with mock.patch.object(IngestionJob.objects, "create", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.finalize()
+
+        session = UploadSession.objects.get()
+        self.assertEqual(session.status, UploadSession.STATUS_OPEN)
+        self.assertIsNone(session.job)
+        self.assertFalse(IngestionJob.objects.exists())
+
+
+# ----------------------------
+# Background ingestion jobs
+# ----------------------------
+@mock.patch.object(jobs, "close_old_connections", lambda: None)
+class IngestionJobTests(EquipmentTestCase):
+    def staged_job(self, content, **fields):
+        path = os.path.join(self.tmp, "job.csv")
+        with open(path, "wb") as f:
+            f.write(content)
+        return IngestionJob.objects.create(filename="job.csv", staged_path=path, **fields)
+
+    def test_run_job_ingests_the_staged_file(self):
+        job = self.staged_job(make_csv([("P-1", "Pump", 1, 2, 3)]), worker=jobs.worker_id())
+        jobs.run_job(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, IngestionJob.STATUS_DONE)
+        self.assertEqual(job.rows_processed, 1)
+        self.assertEqual(job.dataset.total_count, 1)
+        self.assertFalse(os.path.exists(job.staged_path))
+
+    def test_orphaned_job_is_failed_once(self):
+        job = self.staged_job(make_csv([("P-1", "Pump", 1, 2, 3)]), worker="gone:1:dead")
+
+        response = self.client.get(f"/api/jobs/{job.id}/")
+        self.assertEqual(response.json()["status"], IngestionJob.STATUS_FAILED)
+        self.assertFalse(os.path.exists(job.staged_path))
+
+        # Failed while queued: the worker must not start it afterwards
+        jobs.run_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, IngestionJob.STATUS_FAILED)
+        self.assertFalse(DatasetUpload.objects.exists())
+
+    def test_finished_job_is_not_failed_by_a_stale_read(self):
+        job = self.staged_job(b"", worker="gone:1:dead", status=IngestionJob.STATUS_RUNNING)
+        IngestionJob.objects.filter(id=job.id).update(status=IngestionJob.STATUS_DONE)
+
+        self.assertFalse(jobs.fail_orphaned(job))
+        self.assertEqual(job.status, IngestionJob.STATUS_DONE)
+
+    def test_live_worker_is_not_orphaned(self):
+        jobs.beat()
+        job = self.staged_job(b"", worker=jobs.worker_id(), status=IngestionJob.STATUS_RUNNING)
+        self.assertFalse(jobs.is_orphaned(job))
+
+
+# ----------------------------
+# Statistics
+# ----------------------------
+class StatsAccumulatorTests(TestCase):
+    def frame(self, rows, seed):
+        rng = np.random.default_rng(seed)
+        df = pd.DataFrame({
+            "type": rng.choice(["Pump", "Valve", "Reactor"], rows),
+            "flowrate": rng.normal(100, 20, rows),
+            "pressure": rng.gamma(2, 3, rows),
+            "temperature": rng.uniform(-10, 300, rows),
+        })
+        df.loc[rng.random(rows) < 0.05, "pressure"] = np.nan
+        return df
+
+    def assertMatches(self, summary, frame):
+        self.assertEqual(summary["count"], len(frame))
+        for field in STAT_FIELDS:
+            values = frame[field].dropna()
+            expected = {
+                "mean": values.mean(),
+                "std": values.std(),
+                "min": values.min(),
+                "max": values.max(),
+                **{f"p{p}": values.quantile(p / 100) for p in PERCENTILES},
+            }
+            for key, value in expected.items():
+                self.assertAlmostEqual(summary[field][key], value, places=9, msg=f"{field} {key}")
+
+    def test_merged_chunks_match_pandas_groupby(self):
+        chunks = [self.frame(rows, seed) for seed, rows in enumerate([1, 700, 2, 1500])]
+        accumulator = StatsAccumulator(sample_size=10000)
+        for chunk in chunks:
+            accumulator.update(chunk)
+        result = accumulator.result()
+
+        everything = pd.concat(chunks, ignore_index=True)
+        self.assertTrue(result["exact_percentiles"])
+        self.assertMatches(result["overall"], everything)
+        self.assertEqual(set(result["by_type"]), set(everything["type"]))
+        for name, group in everything.groupby("type"):
+            with self.subTest(type=name):
+                self.assertMatches(result["by_type"][name], group)
+
+    def test_sampled_percentiles_stay_close(self):
+        frame = self.frame(20000, seed=7)
+        accumulator = StatsAccumulator(sample_size=5000)
+        accumulator.update(frame)
+        result = accumulator.result()
+
+        self.assertFalse(result["exact_percentiles"])
+        median = frame["temperature"].median()
+        self.assertAlmostEqual(result["overall"]["temperature"]["p50"], median, delta=10)
+        self.assertAlmostEqual(result["overall"]["temperature"]["mean"], frame["temperature"].mean())
+
+
+# ----------------------------
+# Chart downsampling
+# ----------------------------
+class LTTBTests(EquipmentTestCase):
+    def test_output_is_bounded_and_keeps_the_endpoints(self):
+        rng = np.random.default_rng(0)
+        for n, threshold in [(10, 3), (1000, 50), (1001, 1000), (5000, 4)]:
+            with self.subTest(n=n, threshold=threshold):
+                x = np.arange(n, dtype="float64")
+                y = rng.normal(size=n).cumsum()
+                sx, sy = lttb(x, y, threshold)
+
+                self.assertEqual(len(sx), threshold)
+                self.assertEqual((sx[0], sx[-1]), (x[0], x[-1]))
+                self.assertTrue(np.all(np.diff(sx) > 0))
+                np.testing.assert_array_equal(sy, y[sx.astype("int64")])
+
+    def test_short_series_is_returned_unchanged(self):
+        x, y = np.arange(5.0), np.arange(5.0) ** 2
+        sx, sy = lttb(x, y, 5)
+        np.testing.assert_array_equal(sx, x)
+        np.testing.assert_array_equal(sy, y)
+
+    def test_keeps_a_spike(self):
+        y = np.zeros(1000)
+        y[437] = 50.0
+        _, sy = lttb(np.arange(1000.0), y, 20)
+        self.assertIn(50.0, sy)
+
+    def test_binned_endpoint_respects_the_point_budget(self):
+        dataset = make_dataset([(f"P-{i}", "Pump", i % 7, i % 5, 20 + i) for i in range(60)])
+        response = self.client.get(
+            f"/api/datasets/{dataset.id}/binned/", {"points": 10, "bins": 4}
+        )
+        self.assertEqual(response.status_code, 200)
+        for field, series in response.json()["series"].items():
+            self.assertEqual(len(series["x"]), 10)
+            self.assertEqual(sum(response.json()["histograms"][field]["counts"]), 60)
+
+
+# ----------------------------
+# Response cache
+# ----------------------------
+class ResponseCacheTests(EquipmentTestCase):
+    def test_upload_invalidates_the_dataset_list(self):
+        self.upload(make_csv([("P-1", "Pump", 1, 2, 3)]), name="first.csv")
+
+        response = self.client.get("/api/datasets/")
+        etag = response["ETag"]
+        self.assertEqual([d["filename"] for d in response.json()], ["first.csv"])
+        self.assertEqual(
+            self.client.get("/api/datasets/", HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        before = generation()
+        self.upload(make_csv([("P-2", "Pump", 1, 2, 3)]), name="second.csv")
+        self.assertNotEqual(generation(), before)
+
+        response = self.client.get("/api/datasets/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(
+            sorted(d["filename"] for d in response.json()), ["first.csv", "second.csv"]
+        )
+
+    def test_cached_records_are_served_until_invalidated(self):
+        dataset = make_dataset([("P-1", "Pump", 1.0, 2.0, 3.0)])
+        url = f"/api/datasets/{dataset.id}/records/"
+        self.assertEqual(len(self.client.get(url).json()["records"]), 1)
+
+        # Written behind the API's back: the cached page is still served
+        EquipmentRecord.objects.create(
+            dataset=dataset, equipment_name="P-2", type=EquipmentType.objects.get(),
+            flowrate=1.0, pressure=2.0, temperature=3.0
+        )
+        self.assertEqual(len(self.client.get(url).json()["records"]), 1)
+
+        invalidate()
+        self.assertEqual(len(self.client.get(url).json()["records"]), 2)
@@ -0,0 +1,159 @@
+import os
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .jobs import enqueue_staged, get_staging_dir
+from .models import UploadSession
+from .validation import parse_mode
+
+
+DEFAULT_MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Bytes copied from the request stream per read
+COPY_BLOCK = 1024 * 1024
+
+
+class UploadError(ValueError):
+    """
+    A rejected upload request; ``status`` is the HTTP status to return and
+    ``state`` the session state, if any, for the client to resync from.
+    """
+
+    def __init__(self, message, status=400, state=None):
+        super().__init__(message)
+        self.status = status
+        self.state = state or {}
+
+
+def get_max_chunk_size():
+    return int(getattr(settings, "EQUIPMENT_UPLOAD_MAX_CHUNK_SIZE", DEFAULT_MAX_CHUNK_SIZE))
+
+
+def session_state(session):
+    return {
+        "upload_id": str(session.id),
+        "filename": session.filename,
+        "size": session.size,
+        "offset": session.received,
+        "status": session.status,
+        "job_id": session.job_id,
+    }
+
+
+def _check_open(session):
+    if session.status != UploadSession.STATUS_OPEN:
+        raise UploadError("Upload is already finalized", status=409, state=session_state(session))
+
+
+def _check_complete(session):
+    _check_open(session)
+    if session.received != session.size:
+        raise UploadError(
+            f"Upload incomplete: {session.received} of {session.size} bytes",
+            status=409,
+            state=session_state(session)
+        )
+
+
+def create_session(filename, size, on_error=None):
+    """Open an upload session with an empty staging file."""
+    if not filename:
+        raise UploadError("'filename' is required")
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError("'size' must be the file size in bytes")
+    if size <= 0:
+        raise UploadError("'size' must be positive")
+
+    session = UploadSession(filename=filename, size=size, on_error=on_error or "")
+    parse_mode(session.on_error)
+
+    session.staged_path = os.path.join(get_staging_dir(), f"upload_{session.id.hex}.part")
+    open(session.staged_path, "wb").close()
+    session.save()
+    return session
+
+
+def append_chunk(session_id, offset, stream, length):
+    """
+    Write ``length`` bytes from ``stream`` at ``offset`` of the staging file.
+
+    The offset must equal the bytes received so far, so a client that lost
+    a response can ask for the session state and resume from there. A chunk
+    cut short by a dropped connection still counts what arrived.
+    """
+    if length > get_max_chunk_size():
+        raise UploadError(f"Chunks are limited to {get_max_chunk_size()} bytes", status=413)
+
+    session = UploadSession.objects.get(id=session_id)
+    _check_open(session)
+    if offset != session.received:
+        raise UploadError(f"Expected offset {session.received}", status=409, state=session_state(session))
+    if offset + length > session.size:
+        raise UploadError("Chunk runs past the declared size", state=session_state(session))
+
+    # No DB lock while the body streams in: a slow client must not hold up
+    # other writers. Two requests for the same offset are retries of the
+    # same chunk, so whichever loses the update below wrote the same bytes.
+    written = 0
+    with open(session.staged_path, "r+b") as f:
+        f.seek(offset)
+        while written < length:
+            block = stream.read(min(COPY_BLOCK, length - written))
+            if not block:
+                break
+            f.write(block)
+            written += len(block)
+
+    updated = UploadSession.objects.filter(
+        id=session_id,
+        status=UploadSession.STATUS_OPEN,
+        received=offset,
+    ).update(received=offset + written, updated_at=timezone.now())
+
+    session.refresh_from_db()
+    if not updated:
+        raise UploadError(f"Expected offset {session.received}", status=409, state=session_state(session))
+    return session
+
+
+def finalize_session(session_id, force=False):
+    """
+    Hand a complete upload to the ingestion pool. Returns ``(session,
+    duplicate)``; ``duplicate`` is the existing dataset when the same file
+    was uploaded before, in which case nothing is ingested.
+    """
+    from .ingest import check_header, content_digest, find_duplicate
+
+    session = UploadSession.objects.get(id=session_id)
+    _check_complete(session)
+
+    # Hash and check the header before taking the lock
+    with open(session.staged_path, "rb") as f:
+        content_hash = content_digest(f)
+        duplicate = None if force else find_duplicate(content_hash)
+        if duplicate is None:
+            check_header(f)
+
+    # Finalized together with its job: if creating the job fails the
+    # session stays open and finalize can be retried
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(id=session_id)
+        _check_complete(session)
+        session.status = UploadSession.STATUS_FINALIZED
+        if duplicate is None:
+            session.job = enqueue_staged(
+                session.filename,
+                session.staged_path,
+                content_hash,
+                session.on_error or None,
+            )
+        session.save(update_fields=["status", "job", "updated_at"])
+
+    if duplicate is not None:
+        os.remove(session.staged_path)
+    return session, duplicate
+
@@ -6,14 +6,44 @@ from .views import (
     DatasetListView,
     DatasetRecordsView,
     UploadCSVView,
-    DatasetPDFView
+    DatasetPDFView,
+    DatasetExportView,
+    DatasetStatsView,
+    DatasetBinnedView,
+    DatasetCompareView,
+    DatasetRejectedView,
+    IngestionJobView,
+    UploadSessionCreateView,
+    UploadSessionView,
+    UploadFinalizeView,
+    MetricsView
+)
+from .async_views import (
+    AsyncDatasetListView,
+    AsyncDatasetRecordsView,
+    AsyncDatasetStatsView,
+    DatasetEventsView
 )
 
 urlpatterns = [
     path("datasets/", DatasetListView.as_view()),
+    path("datasets/compare/", DatasetCompareView.as_view()),
     path("datasets/<int:dataset_id>/records/", DatasetRecordsView.as_view()),
     path("upload-csv/", UploadCSVView.as_view(), name="upload-csv"),
     path("datasets/<int:dataset_id>/download/", DatasetPDFView.as_view()),
+    path("datasets/<int:dataset_id>/export/", DatasetExportView.as_view()),
+    path("datasets/<int:dataset_id>/stats/", DatasetStatsView.as_view()),
+    path("datasets/<int:dataset_id>/binned/", DatasetBinnedView.as_view()),
+    path("datasets/<int:dataset_id>/rejected/", DatasetRejectedView.as_view()),
+    path("jobs/<int:job_id>/", IngestionJobView.as_view()),
+    path("uploads/", UploadSessionCreateView.as_view()),
+    path("uploads/<uuid:upload_id>/", UploadSessionView.as_view()),
+    path("uploads/<uuid:upload_id>/finalize/", UploadFinalizeView.as_view()),
+    path("metrics/", MetricsView.as_view()),
+    path("async/datasets/", AsyncDatasetListView.as_view()),
+    path("async/datasets/<int:dataset_id>/records/", AsyncDatasetRecordsView.as_view()),
+    path("async/datasets/<int:dataset_id>/stats/", AsyncDatasetStatsView.as_view()),
+    path("events/", DatasetEventsView.as_view()),
 
 ]
 
@@ -0,0 +1,204 @@
+import csv
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import EquipmentRecord, EquipmentType
+from .records import RANGE_FIELDS
+
+
+MODES = ["reject", "quarantine"]
+
+DEFAULT_MAX_EXAMPLES = 20
+
+# Physically possible readings; (low, high) with None for no bound
+DEFAULT_RANGES = {
+    "flowrate": (0.0, None),
+    "pressure": (0.0, None),
+    "temperature": (-273.15, None),
+}
+
+
+class CSVValidationError(ValueError):
+    """An upload that failed validation; ``report`` says why."""
+
+    def __init__(self, report):
+        super().__init__(json.dumps(report))
+        self.report = report
+
+
+def get_mode():
+    return getattr(settings, "EQUIPMENT_VALIDATION_MODE", "reject")
+
+
+def parse_mode(value):
+    mode = value or get_mode()
+    if mode not in MODES:
+        raise CSVValidationError({"error": f"'on_error' must be one of: {', '.join(MODES)}"})
+    return mode
+
+
+def get_ranges():
+    return getattr(settings, "EQUIPMENT_VALIDATION_RANGES", DEFAULT_RANGES)
+
+
+def get_max_examples():
+    return int(getattr(settings, "EQUIPMENT_VALIDATION_MAX_EXAMPLES", DEFAULT_MAX_EXAMPLES))
+
+
+def get_quarantine_dir():
+    path = str(getattr(settings, "EQUIPMENT_QUARANTINE_DIR", settings.BASE_DIR / "quarantine"))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def quarantine_path(dataset_id):
+    return os.path.join(get_quarantine_dir(), f"dataset_{dataset_id}_rejected.csv")
+
+
+def delete_quarantine(dataset_id):
+    path = quarantine_path(dataset_id)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def text_limits():
+    """Longest value the table accepts for each text field."""
+    return {
+        "equipment_name": EquipmentRecord._meta.get_field("equipment_name").max_length,
+        "type": EquipmentType._meta.get_field("name").max_length,
+    }
+
+
+class RowValidator:
+    """
+    Vectorized row checks, one chunk at a time: missing or over-long text,
+    and missing, non-numeric or out-of-range readings. Keeps per-field
+    error counts and the first offending rows for the report.
+
+    NumPy and pandas are imported per call, as the rest of this module is
+    used by views that should not load them.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.invalid = 0
+        self.counts = {}
+        self.examples = []
+        self.limits = text_limits()
+        self.ranges = get_ranges()
+        self.max_examples = get_max_examples()
+
+    def _problems(self, raw, df):
+        import numpy as np
+
+        problems = {}
+
+        for field, limit in self.limits.items():
+            text = df[field].where(df[field].notna(), "").astype(str)
+            problems[(field, "missing")] = text == ""
+            problems[(field, "too_long")] = text.str.len() > limit
+
+        for field in RANGE_FIELDS:
+            values = df[field]
+            present = raw[field].notna()
+            problems[(field, "missing")] = ~present
+            problems[(field, "non_numeric")] = present & values.isna()
+
+            low, high = self.ranges.get(field, (None, None))
+            out = np.isinf(values)
+            if low is not None:
+                out |= values < low
+            if high is not None:
+                out |= values > high
+            problems[(field, "out_of_range")] = out
+
+        return {key: mask.to_numpy(dtype=bool) for key, mask in problems.items()}
+
+    def check(self, raw, df):
+        """
+        Validate a chunk: ``raw`` with headers mapped to record fields and
+        ``df`` its normalized copy. Returns the boolean mask of invalid rows
+        and a Series of "field: problem; ..." messages for those rows.
+        """
+        import numpy as np
+        import pandas as pd
+
+        problems = self._problems(raw, df)
+
+        invalid = np.zeros(len(df), dtype=bool)
+        for (field, problem), mask in problems.items():
+            count = int(mask.sum())
+            if count:
+                errors = self.counts.setdefault(field, {})
+                errors[problem] = errors.get(problem, 0) + count
+            invalid |= mask
+
+        index = np.flatnonzero(invalid)
+        messages = pd.Series("", index=index, dtype=object)
+        for (field, problem), mask in problems.items():
+            hit = mask[index]
+            if hit.any():
+                messages[hit] = messages[hit] + f"{field}: {problem}; "
+        messages = messages.str.rstrip("; ")
+
+        for i in index[:max(self.max_examples - len(self.examples), 0)].tolist():
+            self.examples.append({
+                "row": self.rows + i + 1,
+                "errors": messages[i],
+                "values": {
+                    f: None if pd.isna(v) else str(v)
+                    for f, v in raw.iloc[i].items()
+                },
+            })
+
+        self.rows += len(df)
+        self.invalid += len(index)
+        messages.index = index + (self.rows - len(df)) + 1
+        return invalid, messages
+
+    def report(self):
+        return {
+            "rows_checked": self.rows,
+            "invalid_rows": self.invalid,
+            "errors": self.counts,
+            "examples": self.examples,
+        }
+
+
+class QuarantineWriter:
+    """
+    Collects invalid rows, with their row number and errors, into a CSV
+    that is moved next to the other quarantined files when the surrounding
+    transaction commits.
+    """
+
+    def __init__(self, headers):
+        handle, self.path = tempfile.mkstemp(prefix=".tmp_", suffix=".csv", dir=get_quarantine_dir())
+        self.file = os.fdopen(handle, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["Row", *headers, "Errors"])
+        self.rows = 0
+
+    def append(self, raw, messages):
+        values = raw.astype(object).where(raw.notna(), "").to_numpy().tolist()
+        self.writer.writerows(
+            [row, *value, message]
+            for row, value, message in zip(messages.index.tolist(), values, messages.tolist())
+        )
+        self.rows += len(values)
+
+    def finish(self, dataset_id):
+        self.file.close()
+        if not self.rows:
+            os.remove(self.path)
+            return
+        transaction.on_commit(lambda: os.replace(self.path, quarantine_path(dataset_id)))
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
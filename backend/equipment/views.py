@@ -1,9 +1,10 @@
 import os
-import pandas as pd
 
-from django.conf import settings
-from django.http import FileResponse, Http404
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
 from django.utils.decorators import method_decorator
+from django.utils.http import http_date, quote_etag
+from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 
 from rest_framework.views import APIView
@@ -13,49 +14,219 @@ from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import AllowAny
 
-from .models import DatasetUpload, EquipmentRecord
+from .models import DatasetUpload, EquipmentRecord, IngestionJob, UploadSession
 from .serializers import (
     DatasetUploadSerializer,
-    EquipmentRecordSerializer,
-    CSVUploadSerializer
+    CSVUploadSerializer,
+    IngestionJobSerializer
 )
-from .pdf_utils import generate_dataset_pdf
+from .caching import cached_json
+from .jobs import (
+    enqueue_ingestion,
+    fail_orphaned,
+    get_live_progress,
+    is_orphaned,
+    schedule_prune,
+    schedule_report
+)
+from .metrics import render_metrics, span
+from .records import (
+    RecordQueryError,
+    filter_records,
+    paginate_records,
+    parse_fields,
+    parse_layout,
+    rows_to_columns,
+    rows_to_records
+)
+from .reports import get_report
+from .uploads import (
+    UploadError,
+    append_chunk,
+    create_session,
+    finalize_session,
+    session_state
+)
+from .validation import CSVValidationError, parse_mode, quarantine_path
+
+# Views backed by NumPy / pandas (stats, binned, compare, export, upload)
+# import their modules when first called, so workers start without them.
+
+
+def is_truthy(value):
+    return str(value).lower() in ("1", "true", "yes", "on")
+
+
+# ----------------------------
+# Payloads, shared with the async views
+# ----------------------------
+def dataset_list_payload():
+    datasets = DatasetUpload.objects.order_by("-uploaded_at")[:5]
+    return DatasetUploadSerializer(datasets, many=True).data
+
+
+def records_payload(dataset_id, params):
+    """Raises DatasetUpload.DoesNotExist or RecordQueryError."""
+    dataset = DatasetUpload.objects.get(id=dataset_id)
+
+    fields = parse_fields(params)
+    layout = parse_layout(params)
+    records = filter_records(EquipmentRecord.objects.filter(dataset=dataset), params)
+    with span("query"):
+        rows, next_cursor = paginate_records(records, params, fields)
+
+    payload = {"dataset": DatasetUploadSerializer(dataset).data}
+    with span("shape"):
+        if layout == "columns":
+            payload["columns"] = rows_to_columns(fields, rows)
+        else:
+            payload["records"] = rows_to_records(fields, rows)
+    payload["next_cursor"] = next_cursor
+
+    return payload
+
+
+def stats_payload(dataset):
+    from .stats import ensure_stats
+
+    return {
+        "dataset_id": dataset.id,
+        "total_count": dataset.total_count,
+        **ensure_stats(dataset),
+    }
 
 
 # ----------------------------
 # List last 5 datasets
 # ----------------------------
 class DatasetListView(APIView):
+    """Cached, with an ETag so polling clients get cheap 304s."""
     permission_classes = [AllowAny]
 
     def get(self, request):
-        datasets = DatasetUpload.objects.order_by("-uploaded_at")[:5]
-        serializer = DatasetUploadSerializer(datasets, many=True)
-        return Response(serializer.data)
+        return cached_json(request, "datasets", dataset_list_payload)
 
 
 # ----------------------------
 # View records of a dataset
 # ----------------------------
 class DatasetRecordsView(APIView):
+    """
+    Records of one dataset. Supports ?fields=, ?type=, ?min_/max_<field>=,
+    ?ordering=, keyset pagination via ?limit= and ?cursor=, and
+    ?layout=columns for a column-oriented payload.
+
+    Records bypass DRF serializers: rows are read with values_list and
+    encoded to JSON in one pass. Responses are cached per query string.
+    """
     permission_classes = [AllowAny]
 
     def get(self, request, dataset_id):
+        return cached_json(
+            request,
+            f"records:{dataset_id}",
+            lambda: self.build(request, dataset_id)
+        )
+
+    def build(self, request, dataset_id):
         try:
-            dataset = DatasetUpload.objects.get(id=dataset_id)
-            records = EquipmentRecord.objects.filter(dataset=dataset)
+            return records_payload(dataset_id, request.query_params)
+        except DatasetUpload.DoesNotExist:
+            return Response(
+                {"error": "Dataset not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except RecordQueryError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-            return Response({
-                "dataset": DatasetUploadSerializer(dataset).data,
-                "records": EquipmentRecordSerializer(records, many=True).data
-            })
 
+# ----------------------------
+# Precomputed statistics of a dataset
+# ----------------------------
+class DatasetStatsView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, dataset_id):
+        try:
+            dataset = DatasetUpload.objects.get(id=dataset_id)
         except DatasetUpload.DoesNotExist:
             return Response(
                 {"error": "Dataset not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
 
+        return Response(stats_payload(dataset))
+
+
+# ----------------------------
+# Pre-binned chart data
+# ----------------------------
+class DatasetBinnedView(APIView):
+    """
+    Histograms per reading (?bins=), a ?x= vs ?y= density grid (?grid=)
+    and LTTB-downsampled series bounded by ?points=. Accepts the same
+    ?type= / ?min_<field>= / ?max_<field>= filters as the records view.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, dataset_id):
+        return cached_json(
+            request,
+            f"binned:{dataset_id}",
+            lambda: self.build(request, dataset_id)
+        )
+
+    def build(self, request, dataset_id):
+        from .binning import bin_dataset, dataset_columns, parse_options
+
+        if not DatasetUpload.objects.filter(id=dataset_id).exists():
+            return Response(
+                {"error": "Dataset not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        params = request.query_params
+
+        try:
+            options = parse_options(params)
+            columns = dataset_columns(dataset_id, params)
+        except RecordQueryError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return {"dataset_id": dataset_id, **bin_dataset(columns, options)}
+
+
+# ----------------------------
+# Compare datasets
+# ----------------------------
+class DatasetCompareView(APIView):
+    """
+    ?ids=1,2,3 - per-type trends of the mean readings and type distribution
+    shifts across datasets, oldest first, from precomputed statistics.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return cached_json(request, "compare", lambda: self.build(request))
+
+    def build(self, request):
+        from .compare import CompareError, compare_datasets, parse_ids
+
+        try:
+            ids = parse_ids(request.query_params)
+        except CompareError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        datasets = list(DatasetUpload.objects.filter(id__in=ids).order_by("uploaded_at", "id"))
+        missing = sorted(set(ids) - {d.id for d in datasets})
+        if missing:
+            return Response(
+                {"error": f"Datasets not found: {', '.join(map(str, missing))}"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return compare_datasets(datasets)
+
 
 # ----------------------------
 # Upload CSV (NO AUTH)
@@ -70,6 +241,8 @@ class UploadCSVView(GenericAPIView):
         return Response({"message": "Use POST method to upload CSV file."})
 
     def post(self, request):
+        from .ingest import check_header, content_digest, find_duplicate, ingest_csv
+
         serializer = CSVUploadSerializer(data=request.data)
 
         if not serializer.is_valid():
@@ -77,37 +250,55 @@ class UploadCSVView(GenericAPIView):
 
         file = serializer.validated_data["file"]
 
-        # Read CSV
-        df = pd.read_csv(file)
-        df.columns = [c.strip().lower() for c in df.columns]
-
-        # Create dataset entry
-        dataset = DatasetUpload.objects.create(filename=file.name)
-
-        # Save records
-        for _, row in df.iterrows():
-            EquipmentRecord.objects.create(
-                dataset=dataset,
-                equipment_name=row.get("equipment name"),
-                type=row.get("type"),
-                flowrate=row.get("flowrate"),
-                pressure=row.get("pressure"),
-                temperature=row.get("temperature"),
+        # Re-upload of an identical file: return the existing dataset
+        with span("hash"):
+            content_hash = content_digest(file)
+        force = is_truthy(request.query_params.get("force", request.data.get("force")))
+        duplicate = None if force else find_duplicate(content_hash)
+        if duplicate is not None:
+            return Response(
+                {
+                    "message": "Identical CSV already uploaded",
+                    "dataset_id": duplicate.id,
+                    "total_count": duplicate.total_count,
+                    "type_distribution": duplicate.type_distribution,
+                    "duplicate": True,
+                },
+                status=status.HTTP_200_OK
             )
 
-        # Summary stats
-        dataset.total_count = len(df)
-        dataset.avg_flowrate = float(df["flowrate"].mean())
-        dataset.avg_pressure = float(df["pressure"].mean())
-        dataset.avg_temperature = float(df["temperature"].mean())
-        dataset.type_distribution = df["type"].value_counts().to_dict()
-        dataset.save()
+        # Bad mode or header: reject before any parsing
+        try:
+            on_error = parse_mode(request.query_params.get("on_error", request.data.get("on_error")))
+            with span("header"):
+                check_header(file)
+        except CSVValidationError as e:
+            return Response(e.report, status=status.HTTP_400_BAD_REQUEST)
 
-        # Keep only last 5 datasets
-        all_datasets = DatasetUpload.objects.order_by("-uploaded_at")
-        if all_datasets.count() > 5:
-            for old in all_datasets[5:]:
-                old.delete()
+        # Large files: hand off to the worker pool and let the client poll
+        if is_truthy(request.query_params.get("async", request.data.get("async"))):
+            job = enqueue_ingestion(file, content_hash, on_error)
+            return Response(
+                {
+                    "message": "CSV queued for ingestion",
+                    "job_id": job.id,
+                    "status": job.status,
+                    "status_url": f"/api/jobs/{job.id}/",
+                },
+                status=status.HTTP_202_ACCEPTED
+            )
+
+        try:
+            dataset, ingest_stats = ingest_csv(
+                file, file.name, content_hash=content_hash, on_error=on_error
+            )
+        except CSVValidationError as e:
+            return Response(e.report, status=status.HTTP_400_BAD_REQUEST)
+
+        schedule_report(dataset.id)
+
+        # Retention (keep last 5 by default) runs in the background
+        schedule_prune()
 
         return Response(
             {
@@ -115,30 +306,260 @@ class UploadCSVView(GenericAPIView):
                 "dataset_id": dataset.id,
                 "total_count": dataset.total_count,
                 "type_distribution": dataset.type_distribution,
+                "elapsed_seconds": ingest_stats["elapsed_seconds"],
+                "rows_per_second": ingest_stats["rows_per_second"],
+                "rejected_count": dataset.rejected_count,
+                "duplicate": False,
             },
             status=status.HTTP_201_CREATED
         )
 
 
 # ----------------------------
-# Download PDF report
+# Resumable chunked uploads
 # ----------------------------
-class DatasetPDFView(APIView):
+def upload_error_response(e):
+    return Response({"error": str(e), **e.state}, status=e.status)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class UploadSessionCreateView(APIView):
+    """
+    POST {"filename", "size", "on_error"?} opens a session. The file is then
+    sent as PUT requests of raw bytes to the returned upload_url, each with
+    an Upload-Offset header, and completed with POST .../finalize/.
+    """
     permission_classes = [AllowAny]
 
+    def post(self, request):
+        try:
+            session = create_session(
+                request.data.get("filename"),
+                request.data.get("size"),
+                request.data.get("on_error")
+            )
+        except UploadError as e:
+            return upload_error_response(e)
+        except CSVValidationError as e:
+            return Response(e.report, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {**session_state(session), "upload_url": f"/api/uploads/{session.id}/"},
+            status=status.HTTP_201_CREATED
+        )
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class UploadSessionView(APIView):
+    """GET reports the offset to resume from; PUT appends a chunk there."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, upload_id):
+        try:
+            session = UploadSession.objects.get(id=upload_id)
+        except UploadSession.DoesNotExist:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(session_state(session))
+
+    def put(self, request, upload_id):
+        try:
+            offset = int(request.headers.get("Upload-Offset", request.query_params.get("offset", "")))
+        except ValueError:
+            return Response(
+                {"error": "Upload-Offset header must be the chunk's byte offset"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            return Response(
+                {"error": "Content-Length header must be the chunk's size in bytes"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            session = append_chunk(upload_id, offset, request.stream, length)
+        except UploadSession.DoesNotExist:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+        except UploadError as e:
+            return upload_error_response(e)
+
+        return Response(session_state(session))
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class UploadFinalizeView(APIView):
+    """Queue a complete upload for ingestion (?force=1 skips deduplication)."""
+    permission_classes = [AllowAny]
+
+    def post(self, request, upload_id):
+        try:
+            session, duplicate = finalize_session(
+                upload_id,
+                force=is_truthy(request.query_params.get("force"))
+            )
+        except UploadSession.DoesNotExist:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+        except UploadError as e:
+            return upload_error_response(e)
+        except CSVValidationError as e:
+            return Response(e.report, status=status.HTTP_400_BAD_REQUEST)
+
+        if duplicate is not None:
+            return Response(
+                {
+                    **session_state(session),
+                    "message": "Identical CSV already uploaded",
+                    "dataset_id": duplicate.id,
+                    "total_count": duplicate.total_count,
+                    "type_distribution": duplicate.type_distribution,
+                    "duplicate": True,
+                },
+                status=status.HTTP_200_OK
+            )
+
+        return Response(
+            {
+                **session_state(session),
+                "message": "CSV queued for ingestion",
+                "status_url": f"/api/jobs/{session.job_id}/",
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+# ----------------------------
+# Export records (CSV / NDJSON / Parquet)
+# ----------------------------
+class DatasetExportView(View):
+    """
+    Streams a dataset as ?format=csv|ndjson|parquet, in constant memory
+    under both WSGI and ASGI.
+
+    A plain Django view, since DRF reserves ?format= for its own renderers.
+    """
+
     def get(self, request, dataset_id):
-        pdf_dir = os.path.join(settings.BASE_DIR, "pdf_reports")
-        os.makedirs(pdf_dir, exist_ok=True)
+        from .exports import CONTENT_TYPES, ExportError, async_chunks, get_streamer
+
+        if not DatasetUpload.objects.filter(id=dataset_id).exists():
+            return JsonResponse({"error": "Dataset not found"}, status=404)
 
-        file_path = os.path.join(pdf_dir, f"dataset_{dataset_id}_report.pdf")
+        fmt = request.GET.get("format", "csv")
 
         try:
-            generate_dataset_pdf(dataset_id, file_path)
+            streamer = get_streamer(fmt)
+        except ExportError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        chunks = streamer(dataset_id)
+        if hasattr(request, "scope"):
+            chunks = async_chunks(chunks)
+
+        response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[fmt])
+        response["Content-Disposition"] = (
+            f'attachment; filename="dataset_{dataset_id}.{fmt}"'
+        )
+        return response
+
+
+# ----------------------------
+# Download PDF report
+# ----------------------------
+class DatasetPDFView(APIView):
+    """
+    Serves the cached report, rendering it on first request. Supports
+    conditional GET via ETag / Last-Modified.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, dataset_id):
+        try:
+            dataset = DatasetUpload.objects.get(id=dataset_id)
+            file_path, digest = get_report(dataset)
+        except DatasetUpload.DoesNotExist:
+            raise Http404("Dataset not found")
         except Exception as e:
             raise Http404(f"Error generating PDF: {str(e)}")
 
+        etag = quote_etag(digest)
+        last_modified = int(os.path.getmtime(file_path))
+
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified
+        )
+        if response is None:
+            response = FileResponse(
+                open(file_path, "rb"),
+                as_attachment=True,
+                filename=f"dataset_{dataset_id}_report.pdf"
+            )
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = "no-cache"
+        return response
+
+
+# ----------------------------
+# Download quarantined rows
+# ----------------------------
+class DatasetRejectedView(APIView):
+    """Rows quarantined at upload (?on_error=quarantine), with their errors."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, dataset_id):
+        file_path = quarantine_path(dataset_id)
+        if not os.path.exists(file_path):
+            raise Http404("No rejected rows for this dataset")
+
         return FileResponse(
             open(file_path, "rb"),
             as_attachment=True,
-            filename=f"dataset_{dataset_id}_report.pdf"
+            filename=f"dataset_{dataset_id}_rejected.csv"
+        )
+
+
+# ----------------------------
+# Ingestion job status
+# ----------------------------
+class IngestionJobView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, job_id):
+        try:
+            job = IngestionJob.objects.get(id=job_id)
+        except IngestionJob.DoesNotExist:
+            return Response(
+                {"error": "Job not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if is_orphaned(job):
+            fail_orphaned(job)
+
+        data = IngestionJobSerializer(job).data
+
+        live = get_live_progress(job.id)
+        if live and job.status == IngestionJob.STATUS_RUNNING:
+            data.update(live)
+
+        return Response(data)
+
+
+# ----------------------------
+# Prometheus metrics
+# ----------------------------
+class MetricsView(APIView):
+    """Request and phase histograms of this process, in Prometheus text format."""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return HttpResponse(
+            render_metrics(),
+            content_type="text/plain; version=0.0.4; charset=utf-8"
         )
@@ -0,0 +1,25 @@
+# Picked up by gunicorn when started from this directory
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+wsgi_app = "config.wsgi:application"
+
+# EQUIPMENT_ASGI=1: serve the ASGI app with uvicorn workers, needed for the
+# async endpoints and the api/events/ stream
+if os.environ.get("EQUIPMENT_ASGI", "0") == "1":
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+
+# EQUIPMENT_PRELOAD=1: load the app and its heavy modules in the master
+# before forking, so workers start warm and share those pages
+preload_app = os.environ.get("EQUIPMENT_PRELOAD", "0") == "1"
+
+
+def when_ready(server):
+    # Keep the garbage collector from writing to (and so copying) the
+    # preloaded objects in every worker
+    if preload_app:
+        gc.freeze()
@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_BASE = "http://127.0.0.1:8000/api"
+
+# Bytes sent per PUT; a dropped connection costs at most one chunk
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# Attempts per chunk before giving up on the upload
+MAX_RETRIES = 5
+
+JOB_POLL_SECONDS = 1.0
+
+# Give up on a running job whose row count stops changing for this long
+# (the server fails jobs whose process died; this covers a hung one)
+JOB_STALL_SECONDS = 300
+
+# Seconds to wait for the server before treating it as unreachable
+TIMEOUT = 30
+
+# Keep-alive connections kept open to the API, shared by all workers
+POOL_SIZE = 8
+
+# Records fetched (and cached) per dataset for the table view
+RECORDS_LIMIT = 1000
+RECORD_FIELDS = ["equipment_name", "type", "flowrate", "pressure", "temperature"]
+
+
+class ApiError(Exception):
+    pass
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Task:
+    """
+    Progress reporting and cancellation for one background operation.
+    Long-running calls check it between requests, so cancelling takes
+    effect after at most one request or chunk.
+    """
+
+    def __init__(self, progress=None):
+        self.cancelled = threading.Event()
+        self._progress = progress
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def check(self):
+        if self.cancelled.is_set():
+            raise Cancelled()
+
+    def progress(self, text, percent=None):
+        self.check()
+        if self._progress is not None:
+            self._progress(text, percent)
+
+    def sleep(self, seconds):
+        if self.cancelled.wait(seconds):
+            raise Cancelled()
+
+
+class ApiClient:
+    """
+    The backend API over one pooled ``requests.Session``: workers reuse its
+    keep-alive connections instead of opening one per request.
+    """
+
+    def __init__(self, base=API_BASE):
+        self.base = base
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def url(self, path):
+        return f"{self.base}/{path}"
+
+    def check(self, response):
+        if response.status_code >= 400:
+            raise ApiError(f"Status Code: {response.status_code}\n\n{response.text}")
+        return response.json()
+
+    def get(self, path, **params):
+        return self.check(self.session.get(self.url(path), params=params, timeout=TIMEOUT))
+
+    def datasets(self):
+        return self.get("datasets/")
+
+    def stats(self, dataset_id):
+        return self.get(f"datasets/{dataset_id}/stats/")
+
+    def records(self, dataset_id):
+        """The first RECORDS_LIMIT records as ``{field: [values]}``."""
+        payload = self.get(
+            f"datasets/{dataset_id}/records/",
+            fields=",".join(RECORD_FIELDS),
+            limit=RECORDS_LIMIT,
+            layout="columns",
+        )
+        return payload["columns"]
+
+    def upload(self, file_path, task):
+        """
+        Upload in chunks. After a failed chunk the server is asked how much
+        it has, and the upload resumes from there.
+        """
+        size = os.path.getsize(file_path)
+        upload = self.check(self.session.post(
+            self.url("uploads/"),
+            json={"filename": os.path.basename(file_path), "size": size},
+            timeout=TIMEOUT
+        ))
+        upload_url = self.url(f"uploads/{upload['upload_id']}/")
+        offset = upload["offset"]
+
+        with open(file_path, "rb") as f:
+            failures = 0
+            while offset < size:
+                task.check()
+                f.seek(offset)
+                chunk = f.read(CHUNK_SIZE)
+                try:
+                    response = self.session.put(
+                        upload_url,
+                        data=chunk,
+                        headers={
+                            "Upload-Offset": str(offset),
+                            "Content-Type": "application/octet-stream",
+                        },
+                        timeout=60
+                    )
+                    # 409: out of step with the server; resync below
+                    if response.status_code != 409:
+                        offset = self.check(response)["offset"]
+                        failures = 0
+                        task.progress(
+                            f"Uploading... {offset // (1024 * 1024)} / {size // (1024 * 1024)} MB",
+                            offset * 100 / size
+                        )
+                        continue
+                except requests.RequestException:
+                    pass
+
+                failures += 1
+                if failures > MAX_RETRIES:
+                    raise ApiError("Upload failed after repeated retries")
+                task.sleep(min(2 ** failures, 30))
+                offset = self.check(self.session.get(upload_url, timeout=TIMEOUT))["offset"]
+
+        return self.check(self.session.post(f"{upload_url}finalize/", timeout=TIMEOUT))
+
+    def wait_for_job(self, job_id, task):
+        last_state, changed = None, time.monotonic()
+        while True:
+            job = self.get(f"jobs/{job_id}/")
+            if job["status"] == "done":
+                return job["dataset"]
+            if job["status"] == "failed":
+                raise ApiError(job.get("error") or "Ingestion failed")
+
+            state = (job["status"], job.get("rows_processed"))
+            if state != last_state:
+                last_state, changed = state, time.monotonic()
+            elif job["status"] == "running" and time.monotonic() - changed > JOB_STALL_SECONDS:
+                raise ApiError(f"Ingestion made no progress for {JOB_STALL_SECONDS} seconds")
+
+            task.progress(f"Processing... {job.get('rows_processed', 0)} rows")
+            task.sleep(JOB_POLL_SECONDS)
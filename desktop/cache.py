@@ -0,0 +1,83 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".equipment_visualizer", "cache.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    id INTEGER PRIMARY KEY,
+    summary TEXT NOT NULL,
+    uploaded_at TEXT,
+    stats TEXT,
+    records TEXT,
+    fetched_at REAL
+)
+"""
+
+
+class LocalCache:
+    """
+    Dataset summaries, statistics and records from the API, kept in SQLite
+    so reopening a dataset needs no request and works offline. Uploaded
+    datasets never change, so entries stay valid until the server prunes
+    the dataset.
+
+    Each call opens its own connection, so workers can use it from any
+    thread.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        with closing(sqlite3.connect(self.path, timeout=10)) as db:
+            with db:
+                yield db
+
+    def datasets(self):
+        """Cached dataset summaries, newest first."""
+        with self._connect() as db:
+            rows = db.execute("SELECT summary FROM datasets ORDER BY uploaded_at DESC").fetchall()
+        return [json.loads(summary) for (summary,) in rows]
+
+    def set_datasets(self, summaries):
+        """
+        Store the server's dataset list. Datasets missing from it have been
+        pruned there and are dropped here too.
+        """
+        ids = [s["id"] for s in summaries]
+        with self._connect() as db:
+            db.executemany(
+                "INSERT INTO datasets (id, summary, uploaded_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET summary = excluded.summary",
+                [(s["id"], json.dumps(s), s.get("uploaded_at")) for s in summaries]
+            )
+            db.execute(
+                f"DELETE FROM datasets WHERE id NOT IN ({','.join('?' * len(ids))})",
+                ids
+            )
+
+    def dataset(self, dataset_id):
+        """``(stats, records)`` of a dataset; either is None when not cached."""
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT stats, records FROM datasets WHERE id = ?", (dataset_id,)
+            ).fetchone()
+        if row is None:
+            return None, None
+        return tuple(json.loads(value) if value else None for value in row)
+
+    def set_dataset(self, dataset_id, stats, records):
+        with self._connect() as db:
+            db.execute(
+                "UPDATE datasets SET stats = ?, records = ?, fetched_at = ? WHERE id = ?",
+                (json.dumps(stats), json.dumps(records), time.time(), dataset_id)
+            )
@@ -1,33 +1,290 @@
 import sys
+
 import requests
+from PyQt5.QtCore import QObject, QRunnable, Qt, QThreadPool, pyqtSignal
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout,
-    QPushButton, QLabel, QFileDialog, QMessageBox
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QSplitter,
+    QPushButton, QLabel, QFileDialog, QMessageBox, QProgressBar,
+    QListWidget, QListWidgetItem, QTableWidget, QTableWidgetItem
 )
-import matplotlib.pyplot as plt
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+from matplotlib.figure import Figure
+
+from api import ApiClient, ApiError, Cancelled, RECORD_FIELDS, Task
+from cache import LocalCache
+
+# Network and parsing run here, never on the GUI thread
+MAX_WORKERS = 4
+
+
+# ----------------------------
+# Background workers
+# ----------------------------
+class WorkerSignals(QObject):
+    progress = pyqtSignal(str, object)
+    result = pyqtSignal(object)
+    error = pyqtSignal(object)
+    finished = pyqtSignal()
+
+
+class Worker(QRunnable):
+    """
+    Runs ``fn(task, *args)`` on the thread pool. Progress, the result and
+    any exception come back as signals, which Qt delivers on the GUI thread.
+    """
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = WorkerSignals()
+        self.task = Task(self.signals.progress.emit)
+
+    def run(self):
+        try:
+            result = self.fn(self.task, *self.args)
+        except Exception as e:
+            self.signals.error.emit(e)
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+# ----------------------------
+# Work done off the GUI thread
+# ----------------------------
+def refresh_datasets(task, api, cache):
+    datasets = api.datasets()
+    cache.set_datasets(datasets)
+    return datasets
 
-API_URL = "http://127.0.0.1:8000/api/upload-csv/"
+
+def fetch_dataset(task, api, cache, dataset_id):
+    """Statistics and records of a dataset, from the cache when present."""
+    stats, records = cache.dataset(dataset_id)
+    if stats is None or records is None:
+        task.progress("Loading dataset...")
+        stats = api.stats(dataset_id)
+        task.check()
+        records = api.records(dataset_id)
+        cache.set_dataset(dataset_id, stats, records)
+    return dataset_id, stats, records
+
+
+def upload_file(task, api, cache, file_path):
+    """Upload, wait for ingestion, then cache the new dataset."""
+    data = api.upload(file_path, task)
+
+    if data.get("duplicate"):
+        dataset_id = data["dataset_id"]
+    else:
+        task.progress("Processing...", 100)
+        dataset_id = api.wait_for_job(data["job_id"], task)
+
+    datasets = refresh_datasets(task, api, cache)
+    return datasets, fetch_dataset(task, api, cache, dataset_id)
 
 
 class EquipmentApp(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Chemical Equipment Visualizer")
-        self.setGeometry(200, 200, 420, 300)
+        self.setGeometry(200, 200, 1000, 640)
+
+        self.api = ApiClient()
+        self.cache = LocalCache()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(MAX_WORKERS)
+        self.workers = set()
+        self.dataset_worker = None
 
         layout = QVBoxLayout()
 
+        buttons = QHBoxLayout()
+        self.upload_btn = QPushButton("Upload CSV")
+        self.upload_btn.clicked.connect(self.upload_csv)
+        self.refresh_btn = QPushButton("Refresh")
+        self.refresh_btn.clicked.connect(self.refresh)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel)
+        for button in [self.upload_btn, self.refresh_btn, self.cancel_btn]:
+            button.setStyleSheet("padding: 8px; font-size: 13px;")
+            buttons.addWidget(button)
+        buttons.addStretch()
+
         self.label = QLabel("Upload CSV to visualize data")
         self.label.setStyleSheet("font-size: 14px;")
 
-        self.upload_btn = QPushButton("Upload CSV")
-        self.upload_btn.setStyleSheet("padding: 8px; font-size: 13px;")
-        self.upload_btn.clicked.connect(self.upload_csv)
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 100)
+        self.progress.setValue(0)
+
+        self.dataset_list = QListWidget()
+        self.dataset_list.currentItemChanged.connect(self.open_dataset)
+
+        # Charts are drawn into the window instead of a blocking plt.show()
+        self.figure = Figure(figsize=(6, 4))
+        self.canvas = FigureCanvasQTAgg(self.figure)
+
+        self.table = QTableWidget()
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
 
+        details = QSplitter(Qt.Vertical)
+        details.addWidget(self.canvas)
+        details.addWidget(self.table)
+
+        splitter = QSplitter(Qt.Horizontal)
+        splitter.addWidget(self.dataset_list)
+        splitter.addWidget(details)
+        splitter.setStretchFactor(1, 3)
+
+        layout.addLayout(buttons)
         layout.addWidget(self.label)
-        layout.addWidget(self.upload_btn)
+        layout.addWidget(self.progress)
+        layout.addWidget(splitter)
         self.setLayout(layout)
 
+        # Cached datasets show at once (and offline); the server list follows
+        self.show_datasets(self.cache.datasets())
+        self.refresh()
+
+    # ----------------------------
+    # Worker plumbing
+    # ----------------------------
+    def start(self, fn, *args, on_result=None):
+        worker = Worker(fn, self.api, self.cache, *args)
+        worker.signals.progress.connect(self.set_status)
+        worker.signals.error.connect(self.show_error)
+        if on_result is not None:
+            worker.signals.result.connect(on_result)
+        worker.signals.finished.connect(lambda: self.finish(worker))
+
+        self.workers.add(worker)
+        self.cancel_btn.setEnabled(True)
+        self.pool.start(worker)
+        return worker
+
+    def finish(self, worker):
+        self.workers.discard(worker)
+        if not self.workers:
+            self.cancel_btn.setEnabled(False)
+
+    def cancel(self):
+        for worker in self.workers:
+            worker.task.cancel()
+
+    def set_status(self, text, percent=None):
+        self.label.setText(text)
+        if percent is not None:
+            self.progress.setValue(int(percent))
+
+    def show_error(self, error):
+        if isinstance(error, Cancelled):
+            self.set_status("Cancelled")
+        elif isinstance(error, requests.RequestException):
+            self.set_status("Offline - showing cached datasets")
+        elif isinstance(error, ApiError):
+            QMessageBox.critical(self, "API Error", str(error))
+        else:
+            QMessageBox.critical(self, "Error", str(error))
+
+    def closeEvent(self, event):
+        self.cancel()
+        self.pool.waitForDone(2000)
+        self.api.close()
+        super().closeEvent(event)
+
+    # ----------------------------
+    # Datasets
+    # ----------------------------
+    def refresh(self):
+        self.start(refresh_datasets, on_result=self.show_datasets)
+
+    def show_datasets(self, datasets):
+        current = self.dataset_list.currentItem()
+        selected = current.data(Qt.UserRole) if current is not None else None
+
+        self.dataset_list.blockSignals(True)
+        self.dataset_list.clear()
+        for dataset in datasets:
+            item = QListWidgetItem(
+                f"{dataset.get('filename') or 'Untitled Dataset'}  ({dataset.get('total_count', 0)})"
+            )
+            item.setData(Qt.UserRole, dataset["id"])
+            self.dataset_list.addItem(item)
+            if dataset["id"] == selected:
+                self.dataset_list.setCurrentItem(item)
+        self.dataset_list.blockSignals(False)
+
+    def select_dataset(self, dataset_id):
+        for row in range(self.dataset_list.count()):
+            item = self.dataset_list.item(row)
+            if item.data(Qt.UserRole) == dataset_id:
+                self.dataset_list.blockSignals(True)
+                self.dataset_list.setCurrentItem(item)
+                self.dataset_list.blockSignals(False)
+
+    def open_dataset(self, item):
+        if item is None:
+            return
+
+        # Only the last selection matters
+        if self.dataset_worker is not None:
+            self.dataset_worker.task.cancel()
+        self.dataset_worker = self.start(
+            fetch_dataset,
+            item.data(Qt.UserRole),
+            on_result=self.show_dataset
+        )
+
+    def show_dataset(self, result):
+        dataset_id, stats, records = result
+        current = self.dataset_list.currentItem()
+        if current is None or current.data(Qt.UserRole) != dataset_id:
+            return
+
+        self.set_status(f"Total Equipment: {stats.get('total_count', 'N/A')}")
+        self.plot_distribution(stats)
+        self.show_records(records)
+
+    def plot_distribution(self, stats):
+        distribution = {
+            name: summary["count"]
+            for name, summary in stats.get("by_type", {}).items()
+        }
+
+        self.figure.clear()
+        ax = self.figure.subplots()
+        if distribution:
+            ax.bar(list(distribution.keys()), list(distribution.values()))
+        else:
+            ax.text(0.5, 0.5, "No equipment distribution data found",
+                    ha="center", va="center", transform=ax.transAxes)
+        ax.set_title("Equipment Type Distribution")
+        ax.set_xlabel("Equipment Type")
+        ax.set_ylabel("Count")
+        self.figure.tight_layout()
+        self.canvas.draw_idle()
+
+    def show_records(self, records):
+        fields = [f for f in RECORD_FIELDS if f in records]
+        rows = len(records[fields[0]]) if fields else 0
+
+        self.table.setUpdatesEnabled(False)
+        self.table.clear()
+        self.table.setColumnCount(len(fields))
+        self.table.setRowCount(rows)
+        self.table.setHorizontalHeaderLabels([f.replace("_", " ").title() for f in fields])
+        for column, field in enumerate(fields):
+            for row, value in enumerate(records[field]):
+                self.table.setItem(row, column, QTableWidgetItem("" if value is None else str(value)))
+        self.table.setUpdatesEnabled(True)
+
+    # ----------------------------
+    # Upload
+    # ----------------------------
     def upload_csv(self):
         file_path, _ = QFileDialog.getOpenFileName(
             self,
@@ -39,45 +296,16 @@ class EquipmentApp(QWidget):
         if not file_path:
             return
 
-        try:
-            # ✅ KEEP POST INSIDE WITH BLOCK
-            with open(file_path, "rb") as f:
-                files = {"file": f}  # matches serializer
-                response = requests.post(API_URL, files=files)
-
-            if response.status_code not in (200, 201):
-                QMessageBox.critical(
-                    self,
-                    "API Error",
-                    f"Status Code: {response.status_code}\n\n{response.text}"
-                )
-                return
-
-            data = response.json()
-
-            total = data.get("total_count", "N/A")
-            self.label.setText(f"Total Equipment: {total}")
-
-            distribution = data.get("type_distribution", {})
-
-            if not distribution:
-                QMessageBox.warning(
-                    self,
-                    "No Data",
-                    "No equipment distribution data found."
-                )
-                return
-
-            plt.figure(figsize=(6, 4))
-            plt.bar(distribution.keys(), distribution.values())
-            plt.title("Equipment Type Distribution")
-            plt.xlabel("Equipment Type")
-            plt.ylabel("Count")
-            plt.tight_layout()
-            plt.show()
+        self.upload_btn.setEnabled(False)
+        self.progress.setValue(0)
+        worker = self.start(upload_file, file_path, on_result=self.uploaded)
+        worker.signals.finished.connect(lambda: self.upload_btn.setEnabled(True))
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+    def uploaded(self, result):
+        datasets, dataset = result
+        self.show_datasets(datasets)
+        self.select_dataset(dataset[0])
+        self.show_dataset(dataset)
 
 
 if __name__ == "__main__":
@@ -3,30 +3,103 @@ import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import './UploadedDatasets.css';
 
+// The list shows the newest datasets, like the backend's datasets/ endpoint
+const MAX_DATASETS = 5;
+
+// Re-fetch interval when the event stream is unavailable (WSGI deployments
+// answer api/events/ with 501)
+const POLL_INTERVAL_MS = 10000;
+
+// How long a failed ingestion stays listed
+const FAILED_JOB_DISPLAY_MS = 10000;
+
 const UploadedDatasets = () => {
   const navigate = useNavigate();
   const [datasets, setDatasets] = useState([]);
+  const [ingestions, setIngestions] = useState({});
   const [loading, setLoading] = useState(true);
   const [searchQuery, setSearchQuery] = useState('');
   const [error, setError] = useState(null);
 
-  // Fetch datasets from backend
+  // Fetch datasets once, then keep them current from the server's event
+  // stream instead of re-fetching. EventSource reconnects by itself and
+  // the server replays events missed in between; if the stream is refused
+  // outright, fall back to polling.
   useEffect(() => {
     fetchDatasets();
+
+    const timers = [];
+    let pollTimer = null;
+
+    const removeIngestion = (jobId) => {
+      setIngestions((current) => {
+        const next = { ...current };
+        delete next[jobId];
+        return next;
+      });
+    };
+
+    const events = new EventSource('http://localhost:8000/api/events/');
+
+    events.onerror = () => {
+      // CONNECTING: a dropped stream the browser will retry. CLOSED: the
+      // server refused it (e.g. 501), so it will not come back.
+      if (events.readyState === EventSource.CLOSED && pollTimer === null) {
+        events.close();
+        pollTimer = setInterval(() => fetchDatasets({ quiet: true }), POLL_INTERVAL_MS);
+      }
+    };
+
+    events.addEventListener('dataset.created', (e) => {
+      const dataset = JSON.parse(e.data);
+      setDatasets((current) =>
+        [dataset, ...current.filter((d) => d.id !== dataset.id)].slice(0, MAX_DATASETS)
+      );
+    });
+
+    events.addEventListener('dataset.pruned', (e) => {
+      const { dataset_id } = JSON.parse(e.data);
+      setDatasets((current) => current.filter((d) => d.id !== dataset_id));
+    });
+
+    events.addEventListener('ingestion.progress', (e) => {
+      const job = JSON.parse(e.data);
+      if (job.status === 'done') {
+        removeIngestion(job.job_id);
+        return;
+      }
+
+      setIngestions((current) => ({ ...current, [job.job_id]: job }));
+      if (job.status === 'failed') {
+        timers.push(setTimeout(() => removeIngestion(job.job_id), FAILED_JOB_DISPLAY_MS));
+      }
+    });
+
+    return () => {
+      events.close();
+      clearInterval(pollTimer);
+      timers.forEach(clearTimeout);
+    };
   }, []);
 
-  const fetchDatasets = async () => {
+  const fetchDatasets = async ({ quiet = false } = {}) => {
     try {
-      setLoading(true);
+      if (!quiet) {
+        setLoading(true);
+      }
       // Update this URL to match your Django backend endpoint
       const response = await axios.get('http://localhost:8000/api/datasets/');
       setDatasets(response.data);
       setError(null);
     } catch (err) {
       console.error('Error fetching datasets:', err);
-      setError('Failed to load datasets');
+      if (!quiet) {
+        setError('Failed to load datasets');
+      }
     } finally {
-      setLoading(false);
+      if (!quiet) {
+        setLoading(false);
+      }
     }
   };
 
@@ -142,6 +215,25 @@ const UploadedDatasets = () => {
         </div>
       </div>
 
+      {/* Uploads being ingested right now */}
+      {Object.keys(ingestions).length > 0 && (
+        <div className="ingestion-list">
+          {Object.values(ingestions).map((job) => (
+            <div
+              key={job.job_id}
+              className={`ingestion-item ${job.status === 'failed' ? 'failed' : ''}`}
+            >
+              <span>{job.filename}</span>
+              <span>
+                {job.status === 'failed'
+                  ? `Failed: ${job.error}`
+                  : `${job.rows_processed || 0} rows processed`}
+              </span>
+            </div>
+          ))}
+        </div>
+      )}
+
       {/* Loading State */}
       {loading && (
         <div className="loading-container">
@@ -154,7 +246,7 @@ const UploadedDatasets = () => {
       {error && (
         <div className="error-container">
           <p>{error}</p>
-          <button onClick={fetchDatasets} className="retry-btn">Retry</button>
+          <button onClick={() => fetchDatasets()} className="retry-btn">Retry</button>
         </div>
       )}
 